@@ -6,10 +6,22 @@
 
 import random
 import copy
+import contextlib
+import io
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 class DaedalusGA:
-    def __init__(self, popsize, generations, mutProb, target_GFA, site_width, site_length, max_height):
+    def __init__(self, popsize, generations, mutProb, target_GFA, site_width, site_length, max_height, seed=None,
+                 time_budget=None, max_evaluations=None, stagnation_generations=None, progress_callback=None):
         self.floor_height = 2.26
+        #own random generator, so runs are reproducible with a seed and independent when run in parallel
+        self.random = random.Random(seed)
         self.popsize = popsize
         self.generations = generations
         self.mutProb = mutProb
@@ -19,6 +31,15 @@ class DaedalusGA:
         self.max_height = max_height
         self.currGeneration = self.initialize_population()
         self.bestIndividual = None
+        self.bestFitness = None
+        #stopping criteria besides the number of generations (seconds, fitness evaluations and
+        #generations without improvement of the best fitness), None disables a criterion
+        self.time_budget = time_budget
+        self.max_evaluations = max_evaluations
+        self.stagnation_generations = stagnation_generations
+        #called after every generation with progress(), which includes the best individual found so far
+        self.progress_callback = progress_callback
+        self.stop_reason = None
         self.site_area = site_length*site_width
 
 
@@ -58,43 +79,43 @@ class DaedalusGA:
         return population
         
     def generate_building(self, x_offset=0, y_offset=0):
-        shape = random.choice(["Rectangle", "L-shape"]) 
+        shape = self.random.choice(["Rectangle", "L-shape"]) 
         max_length = (self.site_length - x_offset )   
         max_width = (self.site_width - y_offset )    
         max_levels = int(self.max_height // self.floor_height)  
 
-        length = random.uniform(self.site_length/1.63**3,  max_length)  
-        width = random.uniform(self.site_length/1.63**3,  max_width)   
+        length = self.random.uniform(self.site_length/1.63**3,  max_length)  
+        width = self.random.uniform(self.site_length/1.63**3,  max_width)   
 
         arm1_thickness = 0
         arm2_thickness = 0
 
         if shape == "L-shape":
             #ensure arms have valid, non-zero lengths "L-shape"
-            arm1_thickness = random.choice([width/1.618, width/1.618**2, width/1.618**3, width/1.618**4]) #golden ratio: aesthetic variables
-            arm2_thickness = random.choice([length/1.618, length/1.618**2, length/1.618**3, length/1.618**4]) #golden ratio: aesthetic variables
+            arm1_thickness = self.random.choice([width/1.618, width/1.618**2, width/1.618**3, width/1.618**4]) #golden ratio: aesthetic variables
+            arm2_thickness = self.random.choice([length/1.618, length/1.618**2, length/1.618**3, length/1.618**4]) #golden ratio: aesthetic variables
 
         #ensure zero arm-thickness for rectangle shape
         elif shape == "Rectangle":
             arm1_thickness = arm2_thickness = 0        
 
-        number_of_levels = random.randint(1, max_levels)
+        number_of_levels = self.random.randint(1, max_levels)
         height = number_of_levels*self.floor_height
-        top_height = random.uniform(1, height/1.618**3) #golden ratio as a constraint for the maximum top height 
-        overhang = random.uniform(1, height/1.618**6) #golden ratio as a constraint for the largest overhang
+        top_height = self.random.uniform(1, height/1.618**3) #golden ratio as a constraint for the maximum top height 
+        overhang = self.random.uniform(1, height/1.618**6) #golden ratio as a constraint for the largest overhang
 
         #for aesthetic symsetry it will always let one of the distances to be zero, but choosen randomly
-        if random.choice([False, True]):
+        if self.random.choice([False, True]):
             dis_x_building = 0
-            dis_y_building = random.uniform(1.5, max(0, self.site_width - y_offset - width - overhang))
+            dis_y_building = self.random.uniform(1.5, max(0, self.site_width - y_offset - width - overhang))
             
         else:
             dis_y_building = 0
-            dis_x_building = random.uniform(1.5, max(0, self.site_length - x_offset - length - overhang))
+            dis_x_building = self.random.uniform(1.5, max(0, self.site_length - x_offset - length - overhang))
         
-        if random.random() < 0.4: 
-            dis_y_building = random.uniform(1.5, max(0, self.site_width - y_offset - width - overhang))
-            dis_x_building = random.uniform(1.5, max(0, self.site_length - x_offset - length - overhang))
+        if self.random.random() < 0.4: 
+            dis_y_building = self.random.uniform(1.5, max(0, self.site_width - y_offset - width - overhang))
+            dis_x_building = self.random.uniform(1.5, max(0, self.site_length - x_offset - length - overhang))
 
     
         ###########OPTIMAL TILT ANGLE ROOF#############
@@ -121,7 +142,7 @@ class DaedalusGA:
 
         return {
             "shape": shape,
-            "roof_type": random.choice(["Pyramid", "Prism", "Pitched"]),
+            "roof_type": self.random.choice(["Pyramid", "Prism", "Pitched"]),
             "length": length,
             "width": width,
             "top_height": top_height,
@@ -129,26 +150,26 @@ class DaedalusGA:
             "arm2_thickness": arm2_thickness,
             "overhang": overhang,
             "num_levels": number_of_levels,
-            "window_sill_height": random.uniform(0.1, 1),
-            "window_width": random.uniform(0.5, 1.260),
-            "window_height": random.uniform(0.5, 1.26),
+            "window_sill_height": self.random.uniform(0.1, 1),
+            "window_width": self.random.uniform(0.5, 1.260),
+            "window_height": self.random.uniform(0.5, 1.26),
             "distance_x_to_building": dis_x_building,
             "distance_y_to_building": dis_y_building, 
-            "factor_south": random.uniform(0.8, 1),
-            "factor_east": random.uniform(0.4, 0.7),
-            "factor_west": random.uniform(0.4, 0.7),
-            "factor_north": random.uniform(0.0, 0.3)
+            "factor_south": self.random.uniform(0.8, 1),
+            "factor_east": self.random.uniform(0.4, 0.7),
+            "factor_west": self.random.uniform(0.4, 0.7),
+            "factor_north": self.random.uniform(0.0, 0.3)
 
         }
 
     def generate_different_building(self, x_offset, y_offset, prev_building):
         new_building = self.generate_building(x_offset, y_offset)
         while new_building["shape"] == prev_building["shape"]:
-            new_building["shape"] = random.choice(["Rectangle", "L-shape"]) 
+            new_building["shape"] = self.random.choice(["Rectangle", "L-shape"]) 
         possible_roof_types = ["Pyramid", "Prism", "Pitched"]
-        new_building["roof_type"] = random.choice(possible_roof_types)
-        new_building["length"] = max(prev_building["length"]/1.63**2, min(new_building["length"] + random.uniform(-1, 1), self.site_length - x_offset))
-        new_building["width"] = max(prev_building["width"]/1.63**2, min(new_building["width"] + random.uniform(-1, 1), self.site_width - y_offset))
+        new_building["roof_type"] = self.random.choice(possible_roof_types)
+        new_building["length"] = max(prev_building["length"]/1.63**2, min(new_building["length"] + self.random.uniform(-1, 1), self.site_length - x_offset))
+        new_building["width"] = max(prev_building["width"]/1.63**2, min(new_building["width"] + self.random.uniform(-1, 1), self.site_width - y_offset))
         return new_building
     
     
@@ -518,27 +539,27 @@ class DaedalusGA:
 
             # Mutate specific properties only
             #the number of levels, wil wither: 1) decrease by 1, 2) stay unchanges, 3) increase by 1
-            if random.random() < self.mutProb:
-                building["num_levels"] += random.randint(-1, 1)
+            if self.random.random() < self.mutProb:
+                building["num_levels"] += self.random.randint(-1, 1)
                 building["num_levels"] = max(1, min(building["num_levels"], int(self.max_height / 2.3)))
 
-            if random.random() < self.mutProb:
+            if self.random.random() < self.mutProb:
             #decrease by -0.1, stay unchanged or increase by 0.1 
-                building["window_sill_height"] += random.uniform(-0.1, 0.1)
+                building["window_sill_height"] += self.random.uniform(-0.1, 0.1)
                 building["window_sill_height"] = max(0.1, min(building["window_sill_height"],0.3))
 
-            if random.random() < self.mutProb:
+            if self.random.random() < self.mutProb:
             #decrease by -0.1, stay unchanged or increase by 0.1 
-                building["window_height"] += random.uniform(-0.1, 0.1)
+                building["window_height"] += self.random.uniform(-0.1, 0.1)
                 building["window_height"] = max(0.1, min(building["window_sill_height"],2))
 
-            if random.random() < self.mutProb:
-                building["window_width"] += random.uniform(-0.1, 0.1)
+            if self.random.random() < self.mutProb:
+                building["window_width"] += self.random.uniform(-0.1, 0.1)
                 building["window_width"] = max(0.5, min(building["window_width"], 2))
 
 
-            if random.random() < self.mutProb:
-                building["top_height"] += random.uniform(-1, 1)
+            if self.random.random() < self.mutProb:
+                building["top_height"] += self.random.uniform(-1, 1)
                 building["top_height"] = max(1, min(building["top_height"], 2))
 
 
@@ -563,8 +584,8 @@ class DaedalusGA:
 
         #determine crossover points
         if len(buildings1) > 1 and len(buildings2) > 1:  
-            point1 = random.randint(0, len(buildings1) - 1)
-            point2 = random.randint(point1, len(buildings1) - 1)
+            point1 = self.random.randint(0, len(buildings1) - 1)
+            point2 = self.random.randint(point1, len(buildings1) - 1)
         else:
             return copy.deepcopy(parent1), copy.deepcopy(parent2)
 
@@ -613,7 +634,7 @@ class DaedalusGA:
         print(f"Arm1 Thickness: {building['arm1_thickness']}")
         print(f"Arm2 Thickness: {building['arm2_thickness']}")
         print(f"Overhang: {building['overhang']}")
-        print(f"top height: {building["top_height"]}")
+        print(f"top height: {building['top_height']}")
         print(f"Number of Levels: {building['num_levels']}")
         #print(f"number of windows length: {num_windows_wall_length:.2f}")
         print(f"Window Sill Height: {building['window_sill_height']}")
@@ -628,61 +649,795 @@ class DaedalusGA:
         #print(f"  - West: {building['factor_west']}")
         #print(f"  - East: {building['factor_east']}")
 
-    def run(self):
-        overall_best_individual = None
-        overall_best_fitness = float('-inf')  
+    def reset_timings(self):
+        #seconds spent per phase of the generation loop, and the number of fitness evaluations
+        self.timings = {"fitness": 0.0, "selection": 0.0, "variation": 0.0}
+        self.n_evaluations = 0
+        self.n_generations = 0
 
-        for generation in range(self.generations):
+    def print_timings(self):
+        total = sum(self.timings.values())
+        print(f"Daedalus stopped ({self.stop_reason}) after {self.n_generations} generations, {self.n_evaluations} fitness evaluations")
+        print(f"Daedalus timings: " + ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in self.timings.items()) + f", total {total:.3f}s")
+
+    def start_run(self):
+        self.reset_timings()
+        self.run_start = time.perf_counter()
+        self.bestIndividual = None
+        self.bestFitness = None
+        self.best_generation = 0
+        self.stagnant_generations = 0
+        self.stop_reason = None
+
+    def stop_criterion(self):
+        #reason to stop before the next generation, or None to continue
+        if self.n_generations >= self.generations:
+            return "generations"
+        if self.time_budget is not None and time.perf_counter() - self.run_start >= self.time_budget:
+            return "time budget"
+        if self.max_evaluations is not None and self.n_evaluations + self.evaluations_per_generation() > self.max_evaluations:
+            return "evaluation budget"
+        if self.stagnation_generations is not None and self.stagnant_generations >= self.stagnation_generations:
+            return "stagnation"
+        return None
+
+    def evaluations_per_generation(self):
+        return self.popsize
+
+    def record_best(self, individual, fitness):
+        #keeps the overall best up to date during the run, returns True when it improved
+        if self.bestFitness is None or fitness > self.bestFitness:
+            self.bestIndividual = individual
+            self.bestFitness = fitness
+            self.best_generation = self.n_generations
+            self.stagnant_generations = 0
+            return True
+        self.stagnant_generations += 1
+        return False
+
+    def progress(self):
+        #state of the running GA, as passed to the progress callback
+        return {
+            "generation": self.n_generations,
+            "evaluations": self.n_evaluations,
+            "elapsed": time.perf_counter() - self.run_start,
+            "best_fitness": self.bestFitness,
+            "best_individual": self.bestIndividual
+        }
+
+    def run(self):
+        self.start_run()
+
+        #each individual is scored once, its fitness is carried along into the next generation's selection
+        t = time.perf_counter()
+        fitness_results = [self.fitness(individual) for individual in self.currGeneration]
+        self.n_evaluations += len(fitness_results)
+        self.timings["fitness"] += time.perf_counter() - t
+
+        while True:
+            self.stop_reason = self.stop_criterion()
+            if self.stop_reason is not None:
+                break
             
             #optinal: 
-            #print(f"Generation {generation + 1}/{self.generations}")
-            
-            #calculate fitness for each individual
-            fitness_results = [self.fitness(individual) for individual in self.currGeneration]
+            #print(f"Generation {self.n_generations + 1}/{self.generations}")
+
+            #select parents based on fitness, the population is ranked once per generation
+            t = time.perf_counter()
+            parent1, parent2 = self.selection(self.currGeneration, fitness_results)
+            self.timings["selection"] += time.perf_counter() - t
 
-            #select parents based on fitness
+            t = time.perf_counter()
             new_population = []
             while len(new_population) < self.popsize:
-                parent1, parent2 = self.selection(self.currGeneration, fitness_results)
                 offspring1, offspring2 = self.crossover(parent1, parent2)
                 new_population.append(self.mutation(offspring1))
                 new_population.append(self.mutation(offspring2))
 
             #update the current generation
             self.currGeneration = new_population[:self.popsize]
+            self.timings["variation"] += time.perf_counter() - t
+
+            #calculate fitness for each individual of the new generation
+            t = time.perf_counter()
+            fitness_results = [self.fitness(individual) for individual in self.currGeneration]
+            self.n_evaluations += len(fitness_results)
+            self.timings["fitness"] += time.perf_counter() - t
+            self.n_generations += 1
 
-            #identify the best individual in this generation
-            generation_best = max(self.currGeneration, key=lambda ind: self.fitness(ind)[0]) 
-            generation_best_fitness = self.fitness(generation_best)
-
-            #update overall best individual if necessary
-            if generation_best_fitness[0] > overall_best_fitness:
-                overall_best_individual = generation_best
-                overall_best_fitness = generation_best_fitness[0]  
-                #best_fitness_green_space = generation_best_fitness[1]   #1 not in use in the GAIA framework 
-                #fitness_number_buildings = generation_best_fitness[2]   #2 not in use in the GAIA framework 
-                best_fitness_compactness = generation_best_fitness[3]   #3
-                #best_fitness_similarity = generation_best_fitness[4]    #4 not in use in the GAIA framework
-                best_fitness_ratio_PV = generation_best_fitness[5]      #5
-                best_fitness_ratio_WW = generation_best_fitness[6]       #6
-                best_fitness_target_GFA = generation_best_fitness[7]     #7
-
-        #set the best overall individual
-        self.bestIndividual = overall_best_individual
-
-        for idx, building in enumerate(overall_best_individual["buildings"]):
+            #identify the best individual in this generation and update overall best individual if necessary
+            best_idx = max(range(len(self.currGeneration)), key=lambda i: fitness_results[i][0])
+            if self.record_best(self.currGeneration[best_idx], fitness_results[best_idx][0]):
+                best_fitness = fitness_results[best_idx]
+
+            if self.progress_callback is not None:
+                self.progress_callback(self.progress())
+
+        #stopped before the first generation: the best of the scored initial population is returned
+        if self.bestIndividual is None:
+            best_idx = max(range(len(self.currGeneration)), key=lambda i: fitness_results[i][0])
+            self.record_best(self.currGeneration[best_idx], fitness_results[best_idx][0])
+            best_fitness = fitness_results[best_idx]
+
+        for idx, building in enumerate(self.bestIndividual["buildings"]):
             building_number = idx + 1  
             self.print_building_parameters(building, building_number)
         
         
         #print results
-        #print(f"Fitness Green Space: {best_fitness_green_space:.3f}") #1  not in use in the GAIA framework
-        #print(f"Fitness Number of buildings: {fitness_number_buildings:.3f}") #2  not in use in the GAIA framework
-        print(f"Fitness compactness: {best_fitness_compactness:.3f}") #3
-        #print(f"Fitness Similarity: {best_fitness_similarity:.3f}") #4 not in use in the GAIA framework
-        print(f"Fitness ratio PV: {best_fitness_ratio_PV:.3f}") #5
-        print(f"Fitness ratio WW: {best_fitness_ratio_WW:.3f}") #6
-        print(f"Fitness GFA: {best_fitness_target_GFA:.3f}") #7
-        print(f"Final Fitness Score of Best Individual: {overall_best_fitness:.4f}")
+        #print(f"Fitness Green Space: {best_fitness[1]:.3f}") #1  not in use in the GAIA framework
+        #print(f"Fitness Number of buildings: {best_fitness[2]:.3f}") #2  not in use in the GAIA framework
+        print(f"Fitness compactness: {best_fitness[3]:.3f}") #3
+        #print(f"Fitness Similarity: {best_fitness[4]:.3f}") #4 not in use in the GAIA framework
+        print(f"Fitness ratio PV: {best_fitness[5]:.3f}") #5
+        print(f"Fitness ratio WW: {best_fitness[6]:.3f}") #6
+        print(f"Fitness GFA: {best_fitness[7]:.3f}") #7
+        print(f"Final Fitness Score of Best Individual: {self.bestFitness:.4f}")
+        self.print_timings()
+        return self.bestIndividual
+
+
+
+#gene codes used by the array engine, the index of a name is its code
+SHAPES = ["Rectangle", "L-shape"]
+ROOF_TYPES = ["Pyramid", "Prism", "Pitched"]
+
+#setbacks searched by solve(), generate_building sets back the building along x or y and leaves the other distance at zero
+SETBACK_GENES = ["distance_x_to_building", "distance_y_to_building"]
+
+#objectives of the Pareto mode and their weights in DaedalusGA.fitness
+PARETO_OBJECTIVES = ["compactness", "PV", "WW", "GFA"]
+FITNESS_WEIGHTS = {"compactness": 0.2, "PV": 0.2, "WW": 0.2, "GFA": 0.4}
+
+#float genes of the array engine, in the order of the building dict
+FLOAT_GENES = ["length", "width", "top_height", "arm1_thickness", "arm2_thickness", "overhang",
+               "window_sill_height", "window_width", "window_height", "distance_x_to_building", "distance_y_to_building",
+               "factor_south", "factor_east", "factor_west", "factor_north"]
+
+
+class DaedalusArrayGA(DaedalusGA):
+    #array backed version of the Daedalus GA for individuals with one building (as used in the GAIA framework)
+    #the population is held as one numpy column per gene, fitness, selection and mutation work on whole columns
+    def __init__(self, popsize, generations, mutProb, target_GFA, site_width, site_length, max_height, seed=None, **stopping):
+        super().__init__(popsize, generations, mutProb, target_GFA, site_width, site_length, max_height, seed=seed, **stopping)
+        #numpy generator seeded from the GA's own random generator, so one seed controls the whole run
+        self.rng = np.random.default_rng(self.random.getrandbits(64))
+        self.genes = self.to_arrays(self.currGeneration)
+
+    def to_arrays(self, population):
+        buildings = [individual["buildings"][0] for individual in population]
+        genes = {name: np.array([building[name] for building in buildings], dtype=float) for name in FLOAT_GENES}
+        genes["num_levels"] = np.array([building["num_levels"] for building in buildings], dtype=int)
+        genes["shape"] = np.array([SHAPES.index(building["shape"]) for building in buildings], dtype=np.int8)
+        genes["roof_type"] = np.array([ROOF_TYPES.index(building["roof_type"]) for building in buildings], dtype=np.int8)
+        return genes
+
+    def to_individual(self, genes, idx):
+        #individual at position idx in the dict format used by DaedalusGA and the BuildingComposer
+        building = {
+            "shape": SHAPES[genes["shape"][idx]],
+            "roof_type": ROOF_TYPES[genes["roof_type"][idx]],
+            "num_levels": int(genes["num_levels"][idx])
+        }
+        building.update({name: float(genes[name][idx]) for name in FLOAT_GENES})
+        return {"number_of_buildings": 1, "buildings": [building]}
+
+    def fitness_array(self, genes):
+        #same total fitness as DaedalusGA.fitness, for the whole population in one pass
+        objectives, invalid = self.objective_arrays(genes)
+
+        #####TOTAL FITNESS################
+        fitness = objectives["compactness"] * (0.2) + objectives["PV"] * (0.2) + objectives["WW"] * (0.2) + objectives["GFA"] * (0.4)
+        return np.where(invalid, 0.0, fitness)
+
+    def bounded_fitness_array(self, genes):
+        #fitness_array with every objective clipped to its [0, 1] scale, used by solve(): the WW ratio is not capped, and
+        #the grid search would otherwise push genes to the range extremes where it exceeds 1
+        objectives, invalid = self.objective_arrays(genes)
+        objectives = {name: np.clip(values, 0.0, 1.0) for name, values in objectives.items()}
+        fitness = objectives["compactness"] * (0.2) + objectives["PV"] * (0.2) + objectives["WW"] * (0.2) + objectives["GFA"] * (0.4)
+        return np.where(invalid, 0.0, fitness)
+
+    def objective_arrays(self, genes):
+        #the four weighted objectives of DaedalusGA.fitness, and the mask of invalid individuals
+        length = genes["length"]
+        width = genes["width"]
+        arm1 = genes["arm1_thickness"]
+        arm2 = genes["arm2_thickness"]
+        levels = genes["num_levels"]
+        is_L = genes["shape"] == SHAPES.index("L-shape")
+
+        ########Fitness TARGET GFA#########
+        ground_area = np.where(is_L, width * arm2 + (length - arm2) * arm1, width * length)
+        area = ground_area * levels
+        fitness_target_GFA = np.where(area > self.target_GFA, self.target_GFA / np.where(area > self.target_GFA, area, 1), area / self.target_GFA)
+
+        ########Fitness PV-ROOF RATIO######
+        ratio_PV = self.PV_ratio_array(genes, is_L)
+
+        #######Fitness WINDOW WALL RATIO####
+        ratio_WW = self.WW_ratio_array(genes) / 0.36
+
+        ######Fitness COMPACTNESS#######
+        height = levels * self.floor_height
+        volume = np.where(is_L, (length * arm1 + (width - arm1) * arm2) * height, width * length * height)
+        surface_area = np.where(is_L,
+                                2 * (length * height + width * height) + ((arm1 * length) + (arm2 * (width - arm1)) * 2),
+                                2 * (width * height + length * height + width * length))
+        a = volume ** (1 / 3)
+        fitness_compactness = np.minimum(6 * (a ** 2) / surface_area, 1.0)
+
+        #invalid L-shapes and buildings exceeding the site get zero fitness
+        invalid = (is_L & (arm1 + arm1 < 3)) | \
+                  (length + genes["distance_x_to_building"] > self.site_length) | \
+                  (width + genes["distance_y_to_building"] > self.site_width)
+        objectives = {"compactness": fitness_compactness, "PV": ratio_PV, "WW": ratio_WW, "GFA": fitness_target_GFA}
+        return objectives, invalid
+
+    def objective_matrix(self, genes):
+        #individuals x PARETO_OBJECTIVES, invalid individuals score zero on every objective
+        objectives, invalid = self.objective_arrays(genes)
+        return np.where(invalid[:, None], 0.0, np.stack([objectives[name] for name in PARETO_OBJECTIVES], axis=1))
+
+    def PV_ratio_array(self, genes, is_L):
+        PV_length = 1.0
+        PV_width = 2.0
+        PV_width_space = 0.1
+        length = genes["length"]
+        width = genes["width"]
+        top_height = genes["top_height"]
+        overhang = genes["overhang"]
+        arm1 = genes["arm1_thickness"]
+        arm2 = genes["arm2_thickness"]
+
+        #rectangle: one roof over the full width
+        width_roof = (top_height**2 + width**2)**0.5 + overhang
+        area_PV = (width_roof // (PV_width + PV_width_space)) * (length // PV_length) * PV_width * PV_length
+        ratio_rect = area_PV / (length * width_roof)
+
+        #L-shape: two rectangles, (length - arm2) x arm1 and arm2 x width
+        length_roof_1 = length - arm2
+        width_roof_1 = (top_height**2 + arm1**2)**0.5 + overhang
+        area_PV_1 = (length_roof_1 // PV_length) * (width_roof_1 // (PV_width + PV_width_space)) * PV_width * PV_length
+        area_PV_2 = (arm2 // PV_length) * (width_roof // (PV_width + PV_width_space)) * PV_width * PV_length
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio_L = (area_PV_1 + area_PV_2) / (length_roof_1 * width_roof_1 + arm2 * width_roof)
+
+        is_pitched = genes["roof_type"] == ROOF_TYPES.index("Pitched")
+        return np.where(is_pitched, np.where(is_L, ratio_L, ratio_rect), 0.0)
+
+    def WW_ratio_array(self, genes):
+        length = genes["length"]
+        width = genes["width"]
+        distance_between_windows = 1.0
+        total_wall_surface = 2 * length + 2 * width
+
+        total_window_surface = np.zeros(length.shape)
+        for factor_name, wall_length in [("factor_south", length), ("factor_north", length), ("factor_east", width), ("factor_west", width)]:
+            adjusted_width = genes["window_width"] * genes[factor_name]
+            adjusted_height = genes["window_height"] * genes[factor_name]
+            n_windows = wall_length // (adjusted_width + distance_between_windows)
+            total_window_surface += n_windows * adjusted_width * adjusted_height
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total_wall_surface > 0, total_window_surface / total_wall_surface, 0.0)
+
+    def mutation_draws(self, rng, n):
+        #random numbers of one mutation step for n individuals, in a fixed order so a population
+        #evolved in a batch (DaedalusBatchGA) draws exactly the same numbers as when evolved alone
+        draws = {}
+        draws["levels_mask"] = rng.random(n) < self.mutProb
+        draws["levels_step"] = rng.integers(-1, 2, n)
+        draws["sill_mask"] = rng.random(n) < self.mutProb
+        draws["sill_step"] = rng.uniform(-0.1, 0.1, n)
+        draws["window_height_mask"] = rng.random(n) < self.mutProb
+        draws["window_width_mask"] = rng.random(n) < self.mutProb
+        draws["window_width_step"] = rng.uniform(-0.1, 0.1, n)
+        draws["top_height_mask"] = rng.random(n) < self.mutProb
+        draws["top_height_step"] = rng.uniform(-1, 1, n)
+        return draws
+
+    def mutation_array(self, genes):
+        #same per-gene mutations as DaedalusGA.mutation, drawn for the whole population at once
+        return self.apply_mutation(genes, self.mutation_draws(self.rng, len(genes["length"])))
+
+    def apply_mutation(self, genes, draws):
+        max_levels = np.floor(np.asarray(self.max_height) / 2.3).astype(int)
+
+        mask = draws["levels_mask"]
+        levels = genes["num_levels"] + np.where(mask, draws["levels_step"], 0)
+        genes["num_levels"] = np.where(mask, np.maximum(1, np.minimum(levels, max_levels)), genes["num_levels"])
+
+        mask = draws["sill_mask"]
+        sill = genes["window_sill_height"] + draws["sill_step"]
+        genes["window_sill_height"] = np.where(mask, np.maximum(0.1, np.minimum(sill, 0.3)), genes["window_sill_height"])
+
+        #as in DaedalusGA.mutation the mutated window height is bounded by the sill height
+        mask = draws["window_height_mask"]
+        genes["window_height"] = np.where(mask, np.maximum(0.1, np.minimum(genes["window_sill_height"], 2)), genes["window_height"])
+
+        mask = draws["window_width_mask"]
+        window_width = genes["window_width"] + draws["window_width_step"]
+        genes["window_width"] = np.where(mask, np.maximum(0.5, np.minimum(window_width, 2)), genes["window_width"])
+
+        mask = draws["top_height_mask"]
+        top_height = genes["top_height"] + draws["top_height_step"]
+        genes["top_height"] = np.where(mask, np.maximum(1, np.minimum(top_height, 2)), genes["top_height"])
+
+        return genes
+
+    def crossover_array(self, genes, parent1, parent2):
+        #children alternate between the two parents, with a single building per individual the
+        #2-point crossover of DaedalusGA has nothing to exchange and returns copies of the parents
+        parents = np.resize(np.array([parent1, parent2]), self.popsize)
+        return {name: column[parents] for name, column in genes.items()}
+
+    def run(self):
+        self.start_run()
+
+        t = time.perf_counter()
+        fitness_results = self.fitness_array(self.genes)
+        self.n_evaluations += len(fitness_results)
+        self.timings["fitness"] += time.perf_counter() - t
+
+        while True:
+            self.stop_reason = self.stop_criterion()
+            if self.stop_reason is not None:
+                break
+
+            #select the two fittest individuals as parents (stable ranking, as DaedalusGA.selection)
+            t = time.perf_counter()
+            ranking = np.argsort(-fitness_results, kind="stable")
+            self.timings["selection"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            self.genes = self.mutation_array(self.crossover_array(self.genes, ranking[0], ranking[1]))
+            self.timings["variation"] += time.perf_counter() - t
+
+            #the new generation is scored once, and the scores are reused for selection in the next generation
+            t = time.perf_counter()
+            fitness_results = self.fitness_array(self.genes)
+            self.n_evaluations += len(fitness_results)
+            self.timings["fitness"] += time.perf_counter() - t
+            self.n_generations += 1
+
+            #update overall best individual if necessary (only improvements are converted to the dict format)
+            generation_best = int(np.argmax(fitness_results))
+            if self.bestFitness is None or fitness_results[generation_best] > self.bestFitness:
+                self.record_best(self.to_individual(self.genes, generation_best), float(fitness_results[generation_best]))
+            else:
+                self.stagnant_generations += 1
+
+            if self.progress_callback is not None:
+                self.progress_callback(self.progress())
+
+        #stopped before the first generation: the best of the scored initial population is returned
+        if self.bestIndividual is None:
+            generation_best = int(np.argmax(fitness_results))
+            self.record_best(self.to_individual(self.genes, generation_best), float(fitness_results[generation_best]))
+
+        self.print_best()
         return self.bestIndividual
 
+    def print_best(self):
+        for idx, building in enumerate(self.bestIndividual["buildings"]):
+            self.print_building_parameters(building, idx + 1)
+
+        best_fitness = self.fitness(self.bestIndividual)
+        print(f"Fitness compactness: {best_fitness[3]:.3f}")
+        print(f"Fitness ratio PV: {best_fitness[5]:.3f}")
+        print(f"Fitness ratio WW: {best_fitness[6]:.3f}")
+        print(f"Fitness GFA: {best_fitness[7]:.3f}")
+        print(f"Final Fitness Score of Best Individual: {self.bestFitness:.4f}")
+        self.print_timings()
+
+    def gene_bounds(self, levels):
+        #ranges of the continuous genes searched by solve(), as drawn by generate_building (roof genes depend on the height)
+        height = levels * self.floor_height
+        min_side = self.site_length / 1.63**3
+        return {
+            "length": (min_side, self.site_length),
+            "width": (min_side, self.site_width),
+            "top_height": (np.minimum(1, height / 1.618**3), np.maximum(1, height / 1.618**3)),
+            "overhang": (np.minimum(1, height / 1.618**6), np.maximum(1, height / 1.618**6)),
+            "window_width": (0.5, 1.26),
+            "window_height": (0.5, 1.26),
+            "factor_south": (0.8, 1),
+            "factor_east": (0.4, 0.7),
+            "factor_west": (0.4, 0.7),
+            "factor_north": (0.0, 0.3)
+        }
+
+    def discrete_combinations(self):
+        #every shape, roof type, number of levels and setback side (index in SETBACK_GENES),
+        #L-shapes also for every golden ratio arm thickness (1.618**1 to 1.618**4)
+        max_levels = max(1, int(self.max_height // self.floor_height))
+        combos = []
+        for levels in range(1, max_levels + 1):
+            for roof in range(len(ROOF_TYPES)):
+                for setback in range(len(SETBACK_GENES)):
+                    combos.append((SHAPES.index("Rectangle"), roof, levels, 0, 0, setback))
+                    for arm1_power in range(1, 5):
+                        for arm2_power in range(1, 5):
+                            combos.append((SHAPES.index("L-shape"), roof, levels, arm1_power, arm2_power, setback))
+        combos = np.array(combos)
+        return {"shape": combos[:, 0], "roof_type": combos[:, 1], "num_levels": combos[:, 2], "arm1_power": combos[:, 3],
+                "arm2_power": combos[:, 4], "setback": combos[:, 5]}
+
+    def combination_genes(self, combos, unit):
+        #genes of the given discrete combinations, unit holds the continuous genes scaled to [0, 1] of their range
+        bounds = self.gene_bounds(combos["num_levels"])
+        n = len(combos["shape"])
+        genes = {name: np.broadcast_to(low + unit[name] * (high - low), n).astype(float) for name, (low, high) in bounds.items()}
+        is_L = combos["shape"] == SHAPES.index("L-shape")
+        genes["arm1_thickness"] = np.where(is_L, genes["width"] / 1.618**combos["arm1_power"], 0.0)
+        genes["arm2_thickness"] = np.where(is_L, genes["length"] / 1.618**combos["arm2_power"], 0.0)
+        #the sill height does not enter the fitness
+        genes["window_sill_height"] = np.full(n, 0.55)
+        #setbacks drawn as in generate_building: the setback side lies between 1.5 m and the space left on the site (either
+        #bound may be the larger one), the other side is zero. generate_building's optional second setback is not searched,
+        #distances only enter the site bounds check, so a building with two setbacks never beats the one with a single setback
+        for setback, (name, side, site_side) in enumerate(zip(SETBACK_GENES, [genes["length"], genes["width"]], [self.site_length, self.site_width])):
+            space = np.maximum(0, site_side - side - genes["overhang"])
+            low = np.minimum(1.5, space)
+            high = np.maximum(1.5, space)
+            genes[name] = np.where(combos["setback"] == setback, low + unit[name] * (high - low), 0.0)
+        genes["num_levels"] = combos["num_levels"].astype(int)
+        genes["shape"] = combos["shape"].astype(np.int8)
+        genes["roof_type"] = combos["roof_type"].astype(np.int8)
+        return genes
+
+    def solve(self, grid_size=17, rounds=4, keep=32, shrink=0.35):
+        #deterministic alternative to run(): every discrete combination (shape, roof type, levels, arm ratios, setback side) is
+        #optimized over the continuous genes (including the setback, see combination_genes) by grid refinement, first on a
+        #joint length x width grid, then gene by gene
+        #after the first round only the best `keep` combinations are refined further
+        #candidates are scored with bounded_fitness_array, so the reported fitness stays within [0, 1]
+        self.start_run()
+        combos = self.discrete_combinations()
+        n_combos = len(combos["shape"])
+        continuous_genes = list(self.gene_bounds(1)) + SETBACK_GENES
+        gene_groups = [("length", "width")] + [(name,) for name in continuous_genes if name not in ("length", "width")]
+        center = {name: np.full(n_combos, 0.5) for name in continuous_genes}
+        radius = 0.5
+        best_fitness = np.full(n_combos, -np.inf)
+        active = np.arange(n_combos)
+        offsets = np.linspace(-1, 1, grid_size)
+
+        for round_idx in range(rounds):
+            t = time.perf_counter()
+            for group in gene_groups:
+                #all grid points of the group for all active combinations, the other genes at their current best
+                grid = np.stack(np.meshgrid(*[offsets] * len(group), indexing="ij"), axis=-1).reshape(-1, len(group))
+                rows = np.repeat(active, len(grid))
+                unit = {name: center[name][rows] for name in center}
+                for gene_idx, name in enumerate(group):
+                    unit[name] = np.clip(unit[name] + np.tile(grid[:, gene_idx], len(active)) * radius, 0, 1)
+                combo_rows = {key: values[rows] for key, values in combos.items()}
+                scores = self.bounded_fitness_array(self.combination_genes(combo_rows, unit)).reshape(len(active), len(grid))
+                self.n_evaluations += scores.size
+
+                best_point = np.argmax(scores, axis=1)
+                improved = scores[np.arange(len(active)), best_point] > best_fitness[active]
+                best_fitness[active[improved]] = scores[improved, best_point[improved]]
+                for name in group:
+                    center[name][active[improved]] = unit[name].reshape(len(active), len(grid))[improved, best_point[improved]]
+            self.timings["fitness"] += time.perf_counter() - t
+            self.n_generations += 1
+
+            radius *= shrink
+            if round_idx == 0:
+                active = active[np.argsort(-best_fitness[active], kind="stable")[:keep]]
+
+        #best combination in the dict format returned by run()
+        best = int(np.argmax(best_fitness))
+        best_combo = {key: values[[best]] for key, values in combos.items()}
+        best_genes = self.combination_genes(best_combo, {name: values[[best]] for name, values in center.items()})
+        self.record_best(self.to_individual(best_genes, 0), float(best_fitness[best]))
+        self.stop_reason = "solved"
+
+        self.print_best()
+        return self.bestIndividual
+
+    def run_pareto(self, archive_size=200):
+        #multi-objective mode: instead of the weighted fitness, a non-dominated archive over the four objectives is kept,
+        #so any weighting can be applied afterwards with select_from_pareto() without running the GA again
+        #parents are drawn uniformly from the archive (with one building per individual the children are mutated copies)
+        self.start_run()
+
+        t = time.perf_counter()
+        objectives = self.objective_matrix(self.genes)
+        self.n_evaluations += len(objectives)
+        self.timings["fitness"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        archive_genes, archive_objectives, _ = self.update_archive({name: column[:0] for name, column in self.genes.items()},
+                                                                    objectives[:0], self.genes, objectives, archive_size)
+        self.timings["selection"] += time.perf_counter() - t
+
+        while True:
+            self.stop_reason = self.stop_criterion()
+            if self.stop_reason is not None:
+                break
+
+            t = time.perf_counter()
+            parents = self.rng.integers(0, len(archive_objectives), self.popsize)
+            self.genes = self.mutation_array({name: column[parents] for name, column in archive_genes.items()})
+            self.timings["variation"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            objectives = self.objective_matrix(self.genes)
+            self.n_evaluations += len(objectives)
+            self.timings["fitness"] += time.perf_counter() - t
+            self.n_generations += 1
+
+            #the archive counts as improved when any child enters it
+            t = time.perf_counter()
+            archive_genes, archive_objectives, improved = self.update_archive(archive_genes, archive_objectives, self.genes, objectives, archive_size)
+            self.timings["selection"] += time.perf_counter() - t
+            if improved:
+                self.best_generation = self.n_generations
+                self.stagnant_generations = 0
+            else:
+                self.stagnant_generations += 1
+
+            if self.progress_callback is not None:
+                self.progress_callback(self.progress())
+
+        self.pareto_genes = archive_genes
+        self.pareto_objectives = archive_objectives
+        self.pareto_set = [{"individual": self.to_individual(archive_genes, idx),
+                            "objectives": dict(zip(PARETO_OBJECTIVES, archive_objectives[idx].tolist()))}
+                           for idx in range(len(archive_objectives))]
+        self.select_from_pareto()
+
+        print(f"Daedalus Pareto mode: {len(self.pareto_set)} non-dominated buildings")
+        self.print_timings()
+        return self.pareto_set
+
+    def update_archive(self, archive_genes, archive_objectives, genes, objectives, archive_size):
+        #non-dominated, distinct members of archive + new individuals, thinned by crowding distance above archive_size
+        all_genes = {name: np.concatenate([archive_genes[name], genes[name]]) for name in genes}
+        all_objectives = np.concatenate([archive_objectives, objectives])
+        _, distinct = np.unique(all_objectives, axis=0, return_index=True)
+        keep = np.sort(distinct)
+        keep = keep[non_dominated_mask(all_objectives[keep])]
+        if len(keep) > archive_size:
+            keep = keep[np.sort(np.argsort(-crowding_distance(all_objectives[keep]), kind="stable")[:archive_size])]
+        improved = bool(np.any(keep >= len(archive_objectives)))
+        return {name: column[keep] for name, column in all_genes.items()}, all_objectives[keep], improved
+
+    def select_from_pareto(self, weights=None):
+        #best building of the Pareto set for a weighting of the objectives (default: the weights of DaedalusGA.fitness)
+        weights = weights if weights is not None else FITNESS_WEIGHTS
+        scores = self.pareto_objectives @ np.array([weights.get(name, 0.0) for name in PARETO_OBJECTIVES])
+        best = int(np.argmax(scores))
+        self.bestIndividual = self.pareto_set[best]["individual"]
+        self.bestFitness = float(scores[best])
+        return self.bestIndividual
+
+
+def non_dominated_mask(points):
+    #True for the rows of points (individuals x objectives, all maximized) that no other row dominates
+    at_least = (points[:, None, :] >= points[None, :, :]).all(axis=2)
+    better = (points[:, None, :] > points[None, :, :]).any(axis=2)
+    return ~(at_least & better).any(axis=0)
+
+
+def crowding_distance(points):
+    #NSGA-II crowding distance, boundary points of every objective get an infinite distance
+    distance = np.zeros(len(points))
+    for obj in range(points.shape[1]):
+        order = np.argsort(points[:, obj], kind="stable")
+        values = points[order, obj]
+        span = values[-1] - values[0]
+        distance[order[[0, -1]]] = np.inf
+        if span > 0 and len(points) > 2:
+            distance[order[1:-1]] += (values[2:] - values[:-2]) / span
+    return distance
+
+
+class DaedalusBatchGA(DaedalusArrayGA):
+    #evolves the populations of several sites together, every gene column gets a leading site axis (sites x popsize)
+    #the site constants broadcast over that axis, so one vectorized pass serves all sites
+    #each site keeps its own random generator, generation and evaluation counters and stopping criteria, a site stops
+    #(and leaves the batch) when its own DaedalusArrayGA run would, so its result is identical to that run with the same seed
+    def __init__(self, site_params, popsize, generations, mutProb, time_budget=None, max_evaluations=None,
+                 stagnation_generations=None, progress_callback=None):
+        #site_params: one dict per site with target_GFA, site_width, site_length, max_height and seed
+        self.site_gas = [DaedalusArrayGA(popsize, generations, mutProb, params["target_GFA"], params["site_width"],
+                                         params["site_length"], params["max_height"], seed=params.get("seed"),
+                                         time_budget=time_budget, max_evaluations=max_evaluations,
+                                         stagnation_generations=stagnation_generations)
+                         for params in site_params]
+        self.floor_height = 2.26
+        self.popsize = popsize
+        self.generations = generations
+        self.mutProb = mutProb
+        self.target_GFA = np.array([[ga.target_GFA] for ga in self.site_gas], dtype=float)
+        self.site_width = np.array([[ga.site_width] for ga in self.site_gas], dtype=float)
+        self.site_length = np.array([[ga.site_length] for ga in self.site_gas], dtype=float)
+        self.max_height = np.array([[ga.max_height] for ga in self.site_gas], dtype=float)
+        self.genes = {name: np.stack([ga.genes[name] for ga in self.site_gas]) for name in self.site_gas[0].genes}
+        #sites still evolving, row i of the batch arrays belongs to site active[i]
+        self.active = np.arange(len(self.site_gas))
+        self.time_budget = time_budget
+        self.max_evaluations = max_evaluations
+        self.stagnation_generations = stagnation_generations
+        self.progress_callback = progress_callback
+        self.bestIndividual = None
+        self.bestFitness = None
+        self.stop_reason = None
+
+    def mutation_array(self, genes):
+        draws = [self.mutation_draws(self.site_gas[site_idx].rng, self.popsize) for site_idx in self.active]
+        return self.apply_mutation(genes, {name: np.stack([site_draws[name] for site_draws in draws]) for name in draws[0]})
+
+    def crossover_array(self, genes, parent1, parent2):
+        #parent1 and parent2 hold one index per site, children alternate between them as in DaedalusArrayGA
+        parents = np.where(np.arange(self.popsize) % 2 == 0, parent1[:, None], parent2[:, None])
+        sites = np.arange(len(parent1))[:, None]
+        return {name: column[sites, parents] for name, column in genes.items()}
+
+    def keep_rows(self, rows):
+        #drops the rows of stopped sites from the batch arrays
+        self.active = self.active[rows]
+        self.genes = {name: column[rows] for name, column in self.genes.items()}
+        for name in ["target_GFA", "site_width", "site_length", "max_height"]:
+            setattr(self, name, getattr(self, name)[rows])
+
+    def count_evaluations(self, fitness_results):
+        self.n_evaluations += fitness_results.size
+        for site_idx in self.active:
+            self.site_gas[site_idx].n_evaluations += self.popsize
+
+    def run(self):
+        self.start_run()
+        for ga in self.site_gas:
+            ga.start_run()
+
+        t = time.perf_counter()
+        fitness_results = self.fitness_array(self.genes)
+        self.count_evaluations(fitness_results)
+        self.timings["fitness"] += time.perf_counter() - t
+
+        while True:
+            #every site checks its own stopping criteria, stopped sites leave the batch
+            keep = []
+            for row, site_idx in enumerate(self.active):
+                ga = self.site_gas[site_idx]
+                ga.stop_reason = ga.stop_criterion()
+                if ga.stop_reason is None:
+                    keep.append(row)
+                elif ga.bestIndividual is None:
+                    #stopped before the first generation: the best of the scored initial population is returned
+                    initial_best = int(np.argmax(fitness_results[row]))
+                    ga.record_best(self.to_row_individual(row, initial_best), float(fitness_results[row, initial_best]))
+            if len(keep) < len(self.active):
+                fitness_results = fitness_results[keep]
+                self.keep_rows(keep)
+            if len(self.active) == 0:
+                break
+
+            t = time.perf_counter()
+            ranking = np.argsort(-fitness_results, axis=1, kind="stable")
+            self.timings["selection"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            self.genes = self.mutation_array(self.crossover_array(self.genes, ranking[:, 0], ranking[:, 1]))
+            self.timings["variation"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            fitness_results = self.fitness_array(self.genes)
+            self.count_evaluations(fitness_results)
+            self.timings["fitness"] += time.perf_counter() - t
+            self.n_generations += 1
+
+            #per site best, only improved sites are converted to the dict format
+            generation_best = np.argmax(fitness_results, axis=1)
+            for row, site_idx in enumerate(self.active):
+                ga = self.site_gas[site_idx]
+                ga.n_generations += 1
+                fitness = float(fitness_results[row, generation_best[row]])
+                if ga.bestFitness is None or fitness > ga.bestFitness:
+                    ga.record_best(self.to_row_individual(row, generation_best[row]), fitness)
+                else:
+                    ga.stagnant_generations += 1
+
+            if self.progress_callback is not None:
+                self.bestIndividual = [ga.bestIndividual for ga in self.site_gas]
+                self.bestFitness = [ga.bestFitness for ga in self.site_gas]
+                self.progress_callback(self.progress())
+
+        self.bestIndividual = [ga.bestIndividual for ga in self.site_gas]
+        self.bestFitness = [ga.bestFitness for ga in self.site_gas]
+        self.stop_reason = "all sites stopped"
+
+        #every site's report is printed by its own GA, so the fitness parts use that site's constants
+        self.site_logs = []
+        for ga in self.site_gas:
+            ga.timings = self.timings
+            log = io.StringIO()
+            with contextlib.redirect_stdout(log):
+                ga.print_best()
+            self.site_logs.append(log.getvalue())
+
+        print(f"Daedalus batch: {len(self.site_gas)} sites, best fitness " + ", ".join(f"{fitness:.4f}" for fitness in self.bestFitness))
+        self.print_timings()
+        return self.bestIndividual
+
+    def to_row_individual(self, row, idx):
+        return self.to_individual({name: column[row] for name, column in self.genes.items()}, idx)
+
+
+def run_start(ga_class, ga_params):
+    #one start of a multi-start run, kept at module level so it can be sent to worker processes
+    log = io.StringIO()
+    start = time.time()
+    with contextlib.redirect_stdout(log):
+        ga = ga_class(**ga_params)
+        ga.run()
+    return {
+        "seed": ga_params["seed"],
+        "best_fitness": ga.bestFitness,
+        "best_individual": ga.bestIndividual,
+        "best_generation": ga.best_generation,
+        "generations": ga.n_generations,
+        "evaluations": ga.n_evaluations,
+        "stop_reason": ga.stop_reason,
+        "time": time.time() - start,
+        "log": log.getvalue()
+    }
+
+
+class DaedalusMultiStart:
+    #runs `starts` independently seeded Daedalus GAs on a process pool and keeps the best result,
+    #top-2 selection converges early so several short runs beat one long one
+    #with split_budget the given budget is shared by the starts: generations and max_evaluations are divided by the number
+    #of starts (same total work as one run), the time budget by the number of pool rounds (same wall time as one run)
+    def __init__(self, popsize, generations, mutProb, target_GFA, site_width, site_length, max_height, seed=None,
+                 starts=4, workers=None, engine=DaedalusArrayGA, split_budget=True, **stopping):
+        self.starts = starts
+        if workers is None:
+            #one start per CPU, inside a worker process (e.g. GAIA's Daedalus pool) the starts run serially
+            workers = 1 if multiprocessing.parent_process() is not None else min(starts, os.cpu_count() or 1)
+        self.workers = workers
+        if split_budget:
+            rounds = math.ceil(starts / max(1, min(workers, starts)))
+            generations = max(1, generations // starts)
+            if stopping.get("max_evaluations") is not None:
+                stopping["max_evaluations"] = stopping["max_evaluations"] / starts
+            if stopping.get("time_budget") is not None:
+                stopping["time_budget"] = stopping["time_budget"] / rounds
+        seed_rng = random.Random(seed)
+        self.start_params = [dict(popsize=popsize, generations=generations, mutProb=mutProb, target_GFA=target_GFA,
+                                  site_width=site_width, site_length=site_length, max_height=max_height,
+                                  seed=seed_rng.getrandbits(32), **stopping) for _ in range(starts)]
+        self.engine = engine
+        self.start_stats = []
+        self.bestIndividual = None
+        self.bestFitness = None
+
+    def run(self):
+        if self.workers > 1 and self.starts > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, self.starts)) as executor:
+                self.start_stats = list(executor.map(run_start, [self.engine] * self.starts, self.start_params))
+        else:
+            self.start_stats = [run_start(self.engine, ga_params) for ga_params in self.start_params]
+
+        #first start with the highest fitness, so the choice does not depend on which start finished first
+        best = max(self.start_stats, key=lambda stats: stats["best_fitness"])
+        self.bestIndividual = best["best_individual"]
+        self.bestFitness = best["best_fitness"]
+
+        print(best["log"], end="")
+        print(f"Daedalus multi-start: {self.starts} starts, best from seed {best['seed']}")
+        for idx, stats in enumerate(self.start_stats):
+            print(f"  start {idx + 1} (seed {stats['seed']}): best fitness {stats['best_fitness']:.4f} at generation {stats['best_generation']}, "
+                  f"{stats['generations']} generations, {stats['evaluations']} evaluations ({stats['stop_reason']}), {stats['time']:.3f}s")
+        return self.bestIndividual
+
+
+#Daedalus engines selectable in GAIA: (class, method returning the best individual), "batch" runs all sites in one DaedalusBatchGA
+DAEDALUS_ENGINES = {"dict": (DaedalusGA, "run"), "array": (DaedalusArrayGA, "run"), "solve": (DaedalusArrayGA, "solve"),
+                    "multistart": (DaedalusMultiStart, "run"), "batch": (DaedalusBatchGA, "run")}
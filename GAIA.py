@@ -7,13 +7,62 @@
 
 
 from GAIAClasses.RectangleAnalyzer import RectangleAnalyzer
+from GAIAClasses.DaedalusCache import DaedalusCache
 from BuildingComposer.BuildingComposer import BuildingComposer  
 from UPGA.UPGA import UPGA    
-from Daedalus import DaedalusGA  
+from Daedalus import DAEDALUS_ENGINES, DaedalusBatchGA  
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import contextlib
+import io
+import os
+import sys
 import time 
 
+
+class TeeLog(io.StringIO):
+    #keeps a copy of the printout (for the Daedalus cache) while still printing it live
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+
+    def write(self, text):
+        self.stream.write(text)
+        return super().write(text)
+
+
+def run_daedalus(ga_params, engine="array", capture=True):
+    #one independent Daedalus GA run, kept at module level so it can be sent to worker processes
+    #in worker processes (capture=True) the printout is only captured and returned, so runs finishing in parallel do not
+    #interleave their output, serial runs print live and return a copy
+    log = io.StringIO() if capture else TeeLog(sys.stdout)
+    start = time.time()
+    with contextlib.redirect_stdout(log):
+        ga_class, method = DAEDALUS_ENGINES[engine]
+        ga = ga_class(**ga_params)
+        best_result = getattr(ga, method)()
+    end = time.time()
+    return best_result, log.getvalue(), end - start
+
+
+def run_daedalus_batch(jobs):
+    #all sites' Daedalus runs evolved together in one DaedalusBatchGA, jobs share the GA and stopping settings, each site applies them on its own
+    site_keys = ["target_GFA", "site_width", "site_length", "max_height", "seed"]
+    site_params = [{key: ga_params[key] for key in site_keys} for ga_params in jobs.values()]
+    shared = {key: value for key, value in next(iter(jobs.values())).items() if key not in site_keys}
+    log = TeeLog(sys.stdout)
+    start = time.time()
+    with contextlib.redirect_stdout(log):
+        ga = DaedalusBatchGA(site_params, **shared)
+        best_results = ga.run()
+    end = time.time()
+    return {site_name: (best_results[idx], ga.site_logs[idx], end - start) for idx, site_name in enumerate(jobs)}
+
+
 class GAIA:
-    def __init__(self, output_path_report, output_path_IFC, geo_data, building_specs, azimuth, altitude, crs, accessability_building_type, serviceavailability_building_type, pop_size, n_gen):
+    def __init__(self, output_path_report, output_path_IFC, geo_data, building_specs, azimuth, altitude, crs, accessability_building_type, serviceavailability_building_type, pop_size, n_gen,
+                 daedalus_popsize=500, daedalus_generations=5000, daedalus_workers=1, seed=None, daedalus_engine="dict",
+                 daedalus_stopping=None, cache_dir=None, daedalus_cache=True, daedalus_cache_tolerance=None,
+                 daedalus_starts=4, upga_solver="ga"):
         self.output_path_report = output_path_report
         self.output_path_IFC = output_path_IFC
         self.geo_data = geo_data 
@@ -25,6 +74,32 @@ class GAIA:
         self.serviceavailability_building_type = serviceavailability_building_type
         self.pop_size = pop_size
         self.n_gen = n_gen
+        self.daedalus_popsize = daedalus_popsize
+        self.daedalus_generations = daedalus_generations
+        #number of worker processes for the per-site Daedalus runs (1 runs them one after another)
+        self.daedalus_workers = daedalus_workers
+        #base seed, each Daedalus run gets its own seed derived from it (None gives unseeded runs)
+        self.seed = seed
+        #"dict" (default) runs the original list-of-dicts Daedalus GA, "array" the numpy engine, "solve" the exhaustive solver,
+        #"multistart" several shorter, differently seeded array GA runs of which the best is kept,
+        #"batch" the array GA for all sites at once in one vectorized run
+        if daedalus_engine not in DAEDALUS_ENGINES:
+            raise ValueError(f"Unsupported Daedalus engine: {daedalus_engine}")
+        self.daedalus_engine = daedalus_engine
+        #number of independent starts per site with the "multistart" engine, the starts share the generations and stopping
+        #budgets above (see DaedalusMultiStart), so a multi-start run costs about as much as one array run
+        self.daedalus_starts = daedalus_starts
+        #optional early stopping of the Daedalus runs, e.g. {"time_budget": 60, "max_evaluations": 500000, "stagnation_generations": 300}
+        self.daedalus_stopping = daedalus_stopping or {}
+        #Daedalus results are cached on disk next to the report, daedalus_cache_tolerance (metres) lets similar sites share results
+        #only seeded runs are cached (seed=None), an unseeded run is meant to give a new random result every time
+        self.cache_dir = cache_dir if cache_dir is not None else (os.path.dirname(output_path_report) or ".")
+        #"ga" runs the UPGA genetic algorithm, "exact" enumerates every layout when the search space is small enough
+        #(see UPGA.solve_exact) and falls back to the GA otherwise
+        if upga_solver not in ["ga", "exact"]:
+            raise ValueError(f"Unsupported UPGA solver: {upga_solver}")
+        self.upga_solver = upga_solver
+        self.daedalus_cache = DaedalusCache(os.path.join(self.cache_dir, "daedalus_cache"), daedalus_cache_tolerance) if daedalus_cache else None
 
     def runGAIA(self):    
 
@@ -60,14 +135,19 @@ class GAIA:
         # 2) - UPGA will assign each building (from building_specs) to a unique site.
         urban_ga = UPGA(self.output_path_report, self.crs, self.geo_data, self.building_specs, 
                         self.azimuth, self.altitude, self.accessability_building_type, self.serviceavailability_building_type, 
-                        popsize=self.pop_size, generations=self.n_gen, mutProb=0.1, plot=True, PlotRun=False)
-        urban_result, site_to_building = urban_ga.run()
+                        popsize=self.pop_size, generations=self.n_gen, mutProb=0.1, plot=True, PlotRun=False, seed=self.seed, cache_dir=self.cache_dir)
+        solution = urban_ga.solve_exact() if self.upga_solver == "exact" else None
+        if solution is not None:
+            urban_result, site_to_building = urban_ga.report_best(solution["best"])
+        else:
+            urban_result, site_to_building = urban_ga.run()
         end = time.time()
         print("UPGA execution time:", round(end - start, 3), "seconds")
 
 
-        all_buildings = []
-        for site in sites:
+        #the Daedalus runs are independent, so the parameters of all assigned sites are collected first
+        daedalus_jobs = {}
+        for site_idx, site in enumerate(sites):
             site_name   = site["name"]
             site_length = site["length"]
             site_width  = site["width"]
@@ -80,22 +160,38 @@ class GAIA:
             target_gfa = self.building_specs[building_id]["target_gfa"]
             max_height = round(urban_result[building_id]["max_height"],2)
 
-            print(f"Running DaedalusGA for {building_id} at {site_name} (GFA {target_gfa}, Max height {max_height})")
-
-            # 3) - Daedalus GA runs and optimized building parameters
-            ga = DaedalusGA(
-                popsize=500,
-                generations=5000,
-                mutProb=0.1,
-                target_GFA=target_gfa,
-                site_width=site_width,
-                site_length=site_length,
-                max_height=max_height
-            )
-            start = time.time()
-            best_result = ga.run()
-            end = time.time()
-            print("Daedalus GA execution time:", round(end - start, 3), "seconds")
+            ga_params = {
+                "popsize": self.daedalus_popsize,
+                "generations": self.daedalus_generations,
+                "mutProb": 0.1,
+                "target_GFA": target_gfa,
+                "site_width": site_width,
+                "site_length": site_length,
+                "max_height": max_height,
+                "seed": None if self.seed is None else self.seed + site_idx + 1,
+                **self.daedalus_stopping
+            }
+            if self.daedalus_engine == "multistart":
+                ga_params["starts"] = self.daedalus_starts
+            cached_run = self.daedalus_cache is not None and ga_params["seed"] is not None
+            daedalus_jobs[site_name] = self.daedalus_cache.snap(ga_params) if cached_run else ga_params
+
+        # 3) - Daedalus GA runs and optimized building parameters (in parallel when daedalus_workers > 1)
+        start = time.time()
+        daedalus_results, printed = self.run_daedalus_jobs(daedalus_jobs, site_to_building)
+        end = time.time()
+        print("Daedalus GA total execution time:", round(end - start, 3), "seconds")
+
+        #results are reported and collected in site order, independent of which run finished first
+        all_buildings = []
+        for site_name, ga_params in daedalus_jobs.items():
+            building_id = site_to_building[site_name]
+            best_result, log, run_time = daedalus_results[site_name]
+
+            if site_name not in printed:
+                self.print_daedalus_header(building_id, site_name, ga_params)
+                print(log, end="")
+                print("Daedalus GA execution time:", round(run_time, 3), "seconds")
 
             if "buildings" not in best_result:
                 raise ValueError(f"DaedalusGA result does not contain 'buildings' key! Got keys: {list(best_result.keys())}")
@@ -127,3 +223,54 @@ class GAIA:
         builder = BuildingComposer(sites, all_buildings, output_file)
         builder.build()
 
+
+    def run_daedalus_jobs(self, daedalus_jobs, site_to_building):
+        #runs (or loads from the cache) the Daedalus GA of every site, returns the (best_result, log, run_time) per site
+        #and the sites whose run was already printed live
+        daedalus_results = {}
+        cache_keys = {}
+        pending_jobs = {}
+        printed = set()
+        #a site's batch result equals its array engine result (it stops on its own budgets), so both engines share cache entries
+        cache_engine = "array" if self.daedalus_engine == "batch" else self.daedalus_engine
+        for site_name, ga_params in daedalus_jobs.items():
+            cached = None
+            if self.daedalus_cache is not None and ga_params["seed"] is not None:
+                cache_keys[site_name] = self.daedalus_cache.key(ga_params, cache_engine)
+                cached = self.daedalus_cache.get(cache_keys[site_name])
+            if cached is None:
+                pending_jobs[site_name] = ga_params
+            else:
+                best_result, log = cached
+                print(f"DaedalusGA for {site_to_building[site_name]} at {site_name} loaded from cache")
+                daedalus_results[site_name] = (best_result, log, 0.0)
+
+        if self.daedalus_engine == "batch":
+            if pending_jobs:
+                daedalus_results.update(run_daedalus_batch(pending_jobs))
+        elif self.daedalus_workers > 1 and len(pending_jobs) > 1:
+            with ProcessPoolExecutor(max_workers=self.daedalus_workers) as executor:
+                futures = {executor.submit(run_daedalus, ga_params, self.daedalus_engine): site_name for site_name, ga_params in pending_jobs.items()}
+                for future in as_completed(futures):
+                    site_name = futures[future]
+                    daedalus_results[site_name] = future.result()
+                    print(f"DaedalusGA for {site_to_building[site_name]} at {site_name} finished")
+        else:
+            for site_name, ga_params in pending_jobs.items():
+                self.print_daedalus_header(site_to_building[site_name], site_name, ga_params)
+                daedalus_results[site_name] = run_daedalus(ga_params, self.daedalus_engine, capture=False)
+                print("Daedalus GA execution time:", round(daedalus_results[site_name][2], 3), "seconds")
+                printed.add(site_name)
+
+        if self.daedalus_cache is not None:
+            for site_name in pending_jobs:
+                if site_name not in cache_keys:
+                    continue
+                best_result, log, _ = daedalus_results[site_name]
+                self.daedalus_cache.put(cache_keys[site_name], pending_jobs[site_name], cache_engine, best_result, log)
+            stats = self.daedalus_cache.stats()
+            print(f"Daedalus cache: {stats['hits']} hits, {stats['misses']} misses")
+        return daedalus_results, printed
+
+    def print_daedalus_header(self, building_id, site_name, ga_params):
+        print(f"Running DaedalusGA for {building_id} at {site_name} (GFA {ga_params['target_GFA']}, Max height {ga_params['max_height']})")
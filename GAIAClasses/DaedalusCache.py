@@ -0,0 +1,63 @@
+#### DaedalusCache.py ###
+#This class is used in the GAIA framework to reuse Daedalus results across runs and sites
+#a Daedalus run only depends on its site dimensions, target GFA, GA settings, seed and the Daedalus code,
+#so results are stored on disk in one file per hash of those inputs
+
+import hashlib
+import inspect
+import json
+import math
+import os
+
+import Daedalus
+
+
+class DaedalusCache:
+    def __init__(self, cache_dir, tolerance=None):
+        self.cache_dir = cache_dir
+        #site dimensions are snapped down to multiples of the tolerance (in metres), so near-identical sites share
+        #entries, None keeps the exact dimensions (the max height is already a whole number of floors from the UPGA)
+        self.tolerance = tolerance
+        self.hits = 0
+        self.misses = 0
+        with open(inspect.getsourcefile(Daedalus), "rb") as file:
+            self.code_version = hashlib.sha256(file.read()).hexdigest()
+
+    def snap(self, ga_params):
+        #parameters the run is done with, snapped down so the building still fits the actual site
+        if not self.tolerance:
+            return dict(ga_params)
+        snapped = dict(ga_params)
+        for name in ["site_width", "site_length"]:
+            snapped[name] = round(math.floor(ga_params[name] / self.tolerance + 1e-9) * self.tolerance, 6)
+        return snapped
+
+    def key(self, ga_params, engine):
+        settings = {name: value for name, value in ga_params.items() if name != "progress_callback"}
+        digest = hashlib.sha256(json.dumps([self.code_version, engine, settings], sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"daedalus_{key[:24]}.json")
+
+    def get(self, key):
+        #returns the cached (best_result, log) or None
+        path = self.path(key)
+        if os.path.exists(path):
+            with open(path) as file:
+                saved = json.load(file)
+            if saved.get("key") == key:
+                self.hits += 1
+                return saved["best_result"], saved["log"]
+        self.misses += 1
+        return None
+
+    def put(self, key, ga_params, engine, best_result, log):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        settings = {name: value for name, value in ga_params.items() if name != "progress_callback"}
+        with open(self.path(key), "w") as file:
+            json.dump({"key": key, "engine": engine, "settings": settings, "best_result": best_result, "log": log}, file, indent=2)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups > 0 else 0.0}
@@ -55,6 +55,14 @@ accessability_building_type="school"
 #Optional: If Another building type than "apartment" and "office" is preffered for serviceavailability, please define:
 serviceavailability_building_type=["apartment", "office"]
 
+#Optional: number of processes used to run the building level Daedalus GA for several sites at the same time, and a seed for reproducible runs
+daedalus_workers = 1
+seed = None
+
+#Optional: Daedalus GA engine, "dict" is the original GA, "array" a faster numpy version of the same GA (other random draws),
+#see GAIA.py for the other engines ("solve", "multistart", "batch")
+daedalus_engine = "dict"
+
 # 7) analyse the geospatial data you provided to check that all elements are included 
 #( ! if there are missing hight values, go to "modify_heights.py" for further instructions !)
 
@@ -75,5 +83,8 @@ serviceavailability_building_type=["apartment", "office"]
 #VisualizeData(crs, geo_data, feature="Nature")
 #######################
 
-GAIA = GAIA(report_path, IFC_file_path, geo_data, building_specs, azimuth, altitude, crs, accessability_building_type, serviceavailability_building_type,  population_size, number_of_generations)
-GAIA.runGAIA()
+#the guard keeps worker processes (daedalus_workers > 1) from starting the tool again when they import this script
+if __name__ == "__main__":
+    GAIA = GAIA(report_path, IFC_file_path, geo_data, building_specs, azimuth, altitude, crs, accessability_building_type, serviceavailability_building_type,  population_size, number_of_generations,
+                daedalus_workers=daedalus_workers, seed=seed, daedalus_engine=daedalus_engine)
+    GAIA.runGAIA()
@@ -9,6 +9,8 @@
 #importing python libraries 
 import random
 import copy
+import numpy as np
+import pandas as pd
 import geopandas as gpd
 from shapely.ops import unary_union
 import os
@@ -20,15 +22,29 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 
 #importing classes
-from UPGA.UPGAClasses.ShadowAnalyzer import ShadowAnalyzer, plot_shadow_from_gdf
+from UPGA.UPGAClasses.EvaluationContext import EvaluationContext
+from UPGA.UPGAClasses.ShadowTable import ShadowTable, UNOCCUPIED_HEIGHT
 from UPGA.UPGAClasses.AccessibilityAnalyzer import AccessibilityAnalyzer
+from UPGA.UPGAClasses.FitnessCache import FitnessCache
+from UPGA.UPGAClasses.Evaluator import SerialEvaluator, make_evaluator
+from UPGA.UPGAClasses.ExactSolver import ExactSolver, search_space_size
+from UPGA.UPGAClasses.DeltaEvaluator import DeltaEvaluator
+from UPGA.UPGAClasses.LazyEvaluator import LazyEvaluator
+from UPGA.UPGAClasses.Genome import Genome, GenomeCodec
+from UPGA.UPGAClasses.Selection import make_selection
+
+#scalar per-building terms of shadow_building_contribution, the only ones kept in cached fitness breakdowns
+SHADOW_BUILDING_TERMS = ["roof_area", "area_existing", "area_new", "affected_ids"]
 
 class UPGA:
     def __init__(self, output_path, crs, geo_data, building_specs, azimuth, altitude, 
                  accessability_building_type="school", 
                  serviceavailability_building_type=["apartment", "office"], 
                  k_n=None, k_b=None, popsize=100, generations=200, mutProb=0.1,  
-                 plot=False, PlotRun=False):
+                 plot=False, PlotRun=False, cache_size=4096, service_categories=None,
+                 cache_dir=None, workers=1, backend="process", seed=None, delta_evaluation=True, delta_debug=False,
+                 shared_geodata=True, selection="top", selection_options=None, elites=1, lazy_evaluation=False,
+                 nature_shadow="sites"):
         
         self.output_path = output_path
         self.crs = crs
@@ -45,22 +61,65 @@ class UPGA:
         self.popsize = popsize
         self.generations = generations
         self.mutProb = mutProb
+        #parent selection ("top", "tournament", "rank_roulette" or "truncation", options e.g. {"size": 3} or {"ratio": 0.5}),
+        #the population is ranked once per generation and the elites best individuals are carried forward unchanged
+        self.selection = make_selection(selection, selection_options)
+        if not 0 <= elites <= popsize:
+            raise ValueError(f"Number of elites must be between 0 and the population size {popsize}: {elites}")
+        self.elites = elites
         self.site_areas = self.CalculateSiteArea(self.sites_gdf)
         self.footprint_ratio = 0.7
         self.floor_height = 2.26
+        #individuals are Genomes (site index and floor count per building), converted to dicts only at the API boundary
+        self.codec = GenomeCodec(building_specs, self.sites_gdf["name"], self.site_areas, self.footprint_ratio, self.floor_height)
         self.plot = plot
         self.PlotRun = PlotRun
+        #random generator for the genetic operators, fixed seed gives reproducible runs on every backend
+        self.random = random.Random(seed)
+        #population evaluation backend ("serial", "thread" or "process"), used when workers > 1
+        self.workers = workers
+        self.backend = backend
+        #process workers attach to the static evaluation data in shared memory instead of receiving it pickled
+        self.shared_geodata = shared_geodata
+        self.evaluator = None
+        #children are evaluated from a parent's cached breakdown, only the terms of changed buildings are recomputed
+        #(delta_debug cross-checks every delta evaluation against a full one)
+        self.delta_evaluator = DeltaEvaluator(self, debug=delta_debug) if delta_evaluation else None
+        #children that can no longer be selected are only evaluated until their fitness bound falls below the selectable ones,
+        #runs in the main process (the threshold rises with every exact evaluation)
+        #selections that can draw every rank (tournament, rank roulette) leave nothing to skip
+        if lazy_evaluation and max(elites, self.selection.survivors(popsize)) >= popsize:
+            raise ValueError(f"Lazy evaluation cannot skip any individual with {selection} selection, every rank can be selected")
+        self.lazy_evaluator = LazyEvaluator(self) if lazy_evaluation else None
+        #parents of every individual in the population, None for the initial population and elites
+        self.parents = None
         self.accessability_building_type = accessability_building_type
         self.serviceavailability_building_type = serviceavailability_building_type
+
+        #service filters per building type: a service counts if any column matches (None = column is set, list = value in list)
+        if service_categories is None:
+            service_categories = {
+                serviceavailability_building_type[0]: {"shop": None, "amenity": ["cafe", "supermarket"]},
+                serviceavailability_building_type[1]: {"amenity": ["cafe", "restaurant"]}
+            }
+        self.service_categories = service_categories
         self.azimuth = azimuth
         self.altitude = altitude
 
+        #read-only evaluation data (filtered layers, site geometries, STRtrees, total areas) built once from geo_data
+        self.context = EvaluationContext(geo_data, self.azimuth, self.altitude, crs=self.crs)
+
         # Determine max distance in area (for walkability/cycleability scaling)
-        minx, miny, maxx, maxy = self.buildings_gdf.total_bounds
-        width_m = maxx - minx
-        height_m = maxy - miny
-        self.D_max = max(width_m, height_m)
+        self.D_max = self.context.D_max
         
+        #scaling factors for nature/barrier crossings in walkability
+        self.k_n = k_n if k_n is not None else len(self.nature_gdf)
+        self.k_b = k_b if k_b is not None else len(self.barriers_gdf)
+
+        #directory for tables reused across runs on the same dataset (defaults to the report directory)
+        if cache_dir is None and output_path is not None:
+            cache_dir = os.path.dirname(output_path) or "."
+        self.cache_dir = cache_dir
 
         #initializing accessibility analyzer for walkability/cycleability
         self.access_analyzer = AccessibilityAnalyzer(
@@ -71,17 +130,73 @@ class UPGA:
             self.cycle_gdf, 
             self.accessability_building_type, 
             self.D_max, 
-            self.k_n = k_n if k_n is not None else len(self.nature_gdf),
-            self.k_b = k_b if k_b is not None else len(self.barriers_gdf)
+            self.k_n,
+            self.k_b,
+            table_dir=self.cache_dir
         )
         
+        #equal weighting for all objectives, insert preferred weighting (all terms are in [0, 1])
+        self.fitness_weights = {
+            "GFA": 0.1667,
+            "Shadow Nature": 0.1667,
+            "Walkability": 0.1667,
+            "Cycleability": 0.1667,
+            "Serviceability": 0.1667,
+            "Shadow Buildings": 0.1667
+        }
+
         #scaling factors for shadow-on-building penalty
         self.S_a = 50.0  # weight for area penalty
         self.S_h = 1.0  # weight for area penalty
+        #weights of the area and hit penalties in the combined shadow-on-building penalty
+        self.W_a = 0.4
+        self.W_h = 0.7
 
         #scaling factor for shadow-on-nature penelty
         self.S_n = 5
 
+        #shadow-on-nature penalty area: "sites" (default) counts the shadows reaching each site's 200 m buffer once per site,
+        #unoccupied sites casting 15 m shadows (the original get_shadow_data overlay), "union" is the nature area covered by the
+        #union of the placed buildings' shadows (not comparable with fitness values of the original UPGA)
+        if nature_shadow not in ["sites", "union"]:
+            raise ValueError(f"Unsupported nature shadow penalty: {nature_shadow}")
+        self.nature_shadow = nature_shadow
+
+        #shadows of new buildings, filled lazily per (site, floor count)
+        self.shadow_table = ShadowTable(self.context, self.floor_height)
+
+        #mean distance from every site to every service category, fixed for the whole run
+        self.site_index = self.context.site_index
+        self.service_distances = self.build_service_distance_table()
+
+        #memoized fitness breakdowns keyed on the canonical genome (see genome_key)
+        self.fitness_cache = FitnessCache(cache_size)
+
+    def build_service_distance_table(self):
+        """
+        Returns a (sites x service categories) array with the mean distance from each site centroid
+        to the services of each category in self.service_categories. Categories without services are NaN.
+        """
+        site_xy = self.context.site_centroids
+        service_xy = self.context.service_centroids
+        service_columns = self.context.service_columns
+
+        table = np.full((len(site_xy), len(self.service_categories)), np.nan)
+        for col, service_filter in enumerate(self.service_categories.values()):
+            mask = np.zeros(len(service_xy), dtype=bool)
+            for column, values in service_filter.items():
+                if column not in service_columns:
+                    continue
+                if values is None:
+                    mask |= pd.notna(service_columns[column])
+                else:
+                    mask |= pd.Series(service_columns[column]).isin(values).to_numpy()
+            if not mask.any():
+                continue
+            offsets = site_xy[:, None, :] - service_xy[mask][None, :, :]
+            table[:, col] = np.hypot(offsets[..., 0], offsets[..., 1]).mean(axis=1)
+        return table
+
     def CalculateSiteArea(self, sites_gdf):
         #calculating area for each site and returns a dict {site_name: area_m2}
         sites_gdf['area_m2'] = sites_gdf.geometry.area.round(2)
@@ -89,79 +204,66 @@ class UPGA:
 
     def initialize_population(self):
         #initiliazes a population with a population size 
-        site_ids = self.sites_gdf["name"].tolist()
-        if len(site_ids) < len(self.building_specs):
+        if len(self.codec.site_names) < len(self.codec.names):
             raise ValueError("Not enough unique sites to assign each building.")
 
+        site_ids = list(range(len(self.codec.site_names)))
         for _ in range(self.popsize):
-            individual = {}
+            sites = []
+            floors = []
             available_sites = site_ids.copy()
-            for name, spec in self.building_specs.items():
-                site = random.choice(available_sites)
+            for target_gfa in self.codec.target_gfas:
+                site = self.random.choice(available_sites)
                 available_sites.remove(site)
-                floors = random.randint(1, 7)
-                site_area = round(self.site_areas[site], 0)
-
-                target_gfa = spec["target_gfa"]
-                if target_gfa < self.site_areas[site] * self.footprint_ratio:
+                n_floors = self.random.randint(1, 7)
+                if target_gfa < self.codec.site_areas[site] * self.footprint_ratio:
                     #if target GFA is small enough to fit on one floor 
-                    gfa = target_gfa
-                    floors = 1
-                else:
-                    #otherwise, assign floors and compute GFA based on footprint_ratio
-                    gfa = site_area * self.footprint_ratio * floors
-
-                individual[name] = {
-                    "site": site,
-                    "type": spec["type"],
-                    "height": floors * self.floor_height,
-                    "gfa": round(gfa)
-                }
-            self.population.append(individual)
+                    n_floors = 1
+                sites.append(site)
+                floors.append(n_floors)
+            self.population.append(Genome(sites, floors))
 
     # Fitness functions
-    def compute_fitness_gfa(self, individual):
+    def compute_fitness_gfa(self, individual, contributions=None):
         #computing fitness based on how close actual GFA (via floors) is to target GFA
 
         total_score = 0.0
         for name, values in individual.items():
-            target_gfa = self.building_specs[name]["target_gfa"]
-            actual_height = values["height"]
-            actual_floors = actual_height / self.floor_height
-            site_name = values["site"]
-            site_area = self.site_areas.get(site_name, 0)
-
-            if site_area <= 0 or self.footprint_ratio <= 0:
-                score = 0.0
+            if contributions is not None and name in contributions:
+                total_score += contributions[name]["gfa"]
             else:
-                ideal_floors = target_gfa // (site_area * self.footprint_ratio) if site_area * self.footprint_ratio > 0 else 0
-                floor_deviation = abs(actual_floors - ideal_floors)
-                score = 1 - (floor_deviation / ideal_floors) if ideal_floors > 0 else 0.0
-                score = max(0.0, min(score, 1.0))
-            total_score += score
+                total_score += self.gfa_score(name, values["site"], values["height"])
 
         avg_score = total_score / len(individual) if len(individual) > 0 else 0.0
         return round(avg_score, 2)
 
-    def compute_shadow_nature_fitness(self, individual):
-        #Fitness score for shadows of new buildings falling on nature zones.
-        # Prepare height mapping from the GA individual
-        height_dict = {values["site"]: values["height"] for values in individual.values()}
-
-        # Calculate shadow polygons for new buildings
-        analyzer = ShadowAnalyzer(self.sites_gdf, height_dict, crs=self.crs)
-        analyzer.calculate_shadows(self.azimuth, self.altitude)
-        shadow_gdf = analyzer.get_shadow_data()
+    def gfa_score(self, name, site_name, actual_height):
+        #GFA score of a single building, 1.0 when its floor count gives the target GFA
+        target_gfa = self.building_specs[name]["target_gfa"]
+        actual_floors = actual_height / self.floor_height
+        site_area = self.site_areas.get(site_name, 0)
 
-        # Filter nature zones to polygonal areas
-        nature_gdf = self.nature_gdf[self.nature_gdf.geometry.type.isin(['Polygon', 'MultiPolygon'])].copy()
+        if site_area <= 0 or self.footprint_ratio <= 0:
+            score = 0.0
+        else:
+            ideal_floors = target_gfa // (site_area * self.footprint_ratio) if site_area * self.footprint_ratio > 0 else 0
+            floor_deviation = abs(actual_floors - ideal_floors)
+            score = 1 - (floor_deviation / ideal_floors) if ideal_floors > 0 else 0.0
+            score = max(0.0, min(score, 1.0))
+        return score
 
-        # Overlay shadows on nature areas to find intersections
-        shadow_hits = gpd.overlay(shadow_gdf, nature_gdf, how='intersection')
+    def compute_shadow_nature_fitness(self, individual):
+        #Fitness score for shadows of new buildings falling on nature zones.
+        # Look up the shadow of each site (site + floor count) in the shadow table
+        if self.nature_shadow == "sites":
+            heights = {values["site"]: values["height"] for values in individual.values()}
+            penalty_area = self.shadow_table.site_nature_overlap_area([heights.get(site_name) for site_name in self.context.site_names])
+        else:
+            entries = [self.shadow_table.get(values["site"], values["height"]) for values in individual.values()]
+            penalty_area = self.shadow_table.nature_overlap_area(entries)
 
         # Calculate shadow penalty as fraction of nature area covered (weighted by 5x factor)
-        total_nature_area = nature_gdf.geometry.area.sum()
-        penalty_area = shadow_hits.geometry.area.sum()
+        total_nature_area = self.context.total_nature_area
         shadow_fitness = 1 - ((penalty_area * self.S_n) / total_nature_area)
         if shadow_fitness > 1:
             shadow_fitness = 1.0
@@ -178,304 +280,354 @@ class UPGA:
         cycle_score = self.access_analyzer.compute_cycleability_score(individual)
         return cycle_score
 
-    def compute_serviceavailability_apartments_fitness(self, individual):
-        """Fitness for service availability (e.g., shops) near apartment-type buildings."""
-        apartment_centroids = {
-            name: self.sites_gdf[self.sites_gdf["name"] == b["site"]].geometry.iloc[0].centroid
-            for name, b in individual.items()
-            if b["type"] == self.serviceavailability_building_type[0]
-        }
-        if not apartment_centroids:
+    def compute_serviceavailability_fitness(self, individual, building_type):
+        """Fitness for service availability near buildings of building_type, read from the site-to-service distance table."""
+        if building_type not in self.service_categories:
             return 0.0
-
-        # Consider nearby shops or supermarkets as services
-        service_spots = self.services_gdf.copy()
-        relevant_services = service_spots[
-            service_spots["shop"].notna() |
-            (service_spots["amenity"].isin(["cafe", "supermarket"]))
-        ].copy()
-        if relevant_services.empty:
+        col = list(self.service_categories).index(building_type)
+        site_rows = [self.site_index[b["site"]] for b in individual.values() if b["type"] == building_type]
+        if not site_rows:
             return 0.0
 
-        relevant_services["centroid"] = relevant_services.geometry.centroid
-        total_distance = 0.0
-        count = 0
-        for _, service_row in relevant_services.iterrows():
-            s_pt = service_row["centroid"]
-            for _, a_pt in apartment_centroids.items():
-                total_distance += s_pt.distance(a_pt)
-                count += 1
-
-        if count == 0:
+        distances = self.service_distances[site_rows, col]
+        if np.isnan(distances).any():
+            #no services of this category in the dataset
             return 0.0
-        avg_dist = total_distance / count
+        #every building sees the same services, so the mean over all pairs is the mean of the per-site means
+        avg_dist = distances.mean()
         service_score = min(1.0, 1 - avg_dist / self.D_max)
         return round(max(0.0, service_score), 3)
 
+    def compute_serviceavailability_apartments_fitness(self, individual):
+        """Fitness for service availability (e.g., shops) near apartment-type buildings."""
+        return self.compute_serviceavailability_fitness(individual, self.serviceavailability_building_type[0])
+
     def compute_serviceavailability_offices_fitness(self, individual):
         """Fitness for service availability (e.g., cafes/restaurants) near office-type buildings."""
-        office_centroids = {
-            name: self.sites_gdf[self.sites_gdf["name"] == b["site"]].geometry.iloc[0].centroid
-            for name, b in individual.items()
-            if b["type"] == self.serviceavailability_building_type[1]
-        }
-        if not office_centroids:
-            return 0.0
-
-        service_spots = self.services_gdf.copy()
-        relevant_services = service_spots[service_spots["amenity"].isin(["cafe", "restaurant"])].copy()
-        if relevant_services.empty:
-            return 0.0
-
-        relevant_services["centroid"] = relevant_services.geometry.centroid
-        total_distance = 0.0
-        count = 0
-        for _, service_row in relevant_services.iterrows():
-            s_pt = service_row["centroid"]
-            for _, o_pt in office_centroids.items():
-                total_distance += s_pt.distance(o_pt)
-                count += 1
+        return self.compute_serviceavailability_fitness(individual, self.serviceavailability_building_type[1])
 
-        if count == 0:
-            return 0.0
-        avg_dist = total_distance / count
-        service_score = min(1.0, 1 - avg_dist / self.D_max)
-        return round(max(0.0, service_score), 3)
-
-    def compute_shadow_building_fitness(self, individual):
+    def compute_shadow_building_fitness(self, individual, contributions=None):
         """
         Computes fitness penalty for shadows between new and existing buildings:
         - Penalizes new buildings casting shadows on existing ones (especially if taller).
         - Penalizes existing buildings casting shadows on new ones.
         Returns a fitness score (1.0 is best), plus details of which buildings are shadowed or not.
+        contributions can hold already computed shadow_building_contribution results per building name.
         """
-        # Prepare existing buildings GeoDataFrame with heights
-        existing_gdf = self.existing_gdf.copy()
-        existing_gdf['height_m'] = existing_gdf['height'].astype(float)
-        existing_gdf = existing_gdf[existing_gdf.geometry.type.isin(['Polygon', 'MultiPolygon'])].copy()
-
-        # Prepare new buildings GeoDataFrame with geometry and height
-        new_buildings = []
-        for b_name, b_values in individual.items():
-            site_name = b_values["site"]
-            site_geom = self.sites_gdf[self.sites_gdf["name"] == site_name].geometry.iloc[0]
-            height_m = b_values["height"]
-            new_buildings.append((b_name, site_geom, height_m))
-        new_gdf = gpd.GeoDataFrame(
-            [{'name': name, 'geometry': geom, 'height_m': h} for name, geom, h in new_buildings],
-            crs=self.crs
-        )
-
-        # Spatial indexes for faster intersection queries
-        existing_sindex = existing_gdf.sindex
-        new_sindex = new_gdf.sindex
-
-        total_roof_area = existing_gdf.geometry.area.sum() + new_gdf.geometry.area.sum()
+        contributions = contributions or {}
 
-        shadowed_by_individual = {b_name: [] for b_name in individual.keys()}
-        not_shadowed_by_individual = {b_name: [] for b_name in individual.keys()}
-        affected_ids = set()
+        #every building's conflicts only depend on its own site and height, they are summed in building order
+        shadowed_by_individual = {}
+        not_shadowed_by_individual = {}
         shadow_on_new_buildings = {}
         shadow_on_new_buildings_full = {}
-
-        def compute_shadow_geometry(name, geom, height):
-            """Helper: compute the shadow geometry polygon(s) for a single building."""
-            temp_gdf = gpd.GeoDataFrame([{'name': name, 'geometry': geom}], crs=self.crs)
-            analyzer = ShadowAnalyzer(temp_gdf, {name: height}, crs=self.crs)
-            analyzer.calculate_shadows(self.azimuth, self.altitude)
-            return unary_union(analyzer.shadow_gdf.geometry)
-
-        # 1. Shadows from each new building onto existing buildings
+        building_terms = []
+        for b_name, b_values in individual.items():
+            contribution = contributions.get(b_name)
+            if contribution is None:
+                contribution = self.shadow_building_contribution(b_values["site"], b_values["height"])
+            shadowed_by_individual[b_name] = contribution["shadowed"]
+            not_shadowed_by_individual[b_name] = contribution["not_shadowed"]
+            building_terms.append(contribution)
+            if contribution["shadow_on_new"] is not None:
+                shadow_on_new_buildings[b_name] = contribution["shadow_on_new"]
+                shadow_on_new_buildings_full[b_name] = contribution["shadow_on_new_full"]
+        fitness_score = self.shadow_building_score(building_terms)
+        shadow_conflicts_area_existing = sum(terms["area_existing"] for terms in building_terms)
+        shadow_conflicts_area_new = sum(terms["area_new"] for terms in building_terms)
+
+        return fitness_score, shadowed_by_individual, not_shadowed_by_individual, shadow_on_new_buildings, shadow_conflicts_area_new, shadow_conflicts_area_existing, shadow_on_new_buildings_full  
+
+    def shadow_building_score(self, building_terms):
+        #shadow on buildings fitness from the SHADOW_BUILDING_TERMS of every new building, summed in building order
+        layer = self.context.existing
+        affected_ids = set()
         shadow_conflicts_area_existing = 0.0
-        for b_name, geom, height in new_buildings:
-            shadow_geom_new = compute_shadow_geometry(b_name, geom, height)
-            # Check existing buildings that lie within the bounds of this shadow geometry
-            possible_idxs = list(existing_sindex.intersection(shadow_geom_new.bounds))
-            for _, exist_row in existing_gdf.iloc[possible_idxs].iterrows():
-                exist_geom = exist_row.geometry
-                exist_height = exist_row['height_m']
-                exist_id = exist_row.get("@id", exist_row.name)  # use '@id' if present, otherwise index
-                if shadow_geom_new.intersects(exist_geom):
-                    overlap_area = shadow_geom_new.intersection(exist_geom).area
-                    if overlap_area > 0:
-                        if height > exist_height:
-                            # New building overshadows this existing building
-                            shadow_conflicts_area_existing += overlap_area
-                            shadowed_by_individual[b_name].append({
-                                "geometry": exist_geom,
-                                "existing_height": exist_height,
-                                "overlap_area": overlap_area,
-                                "id": exist_id
-                            })
-                            affected_ids.add(exist_id)
-                        elif height < exist_height:
-                            # Existing building is taller (new building not causing shadow issue here)
-                            not_shadowed_by_individual[b_name].append({
-                                "geometry": exist_geom,
-                                "existing_height": exist_height,
-                                "overlap_area": overlap_area,
-                                "id": exist_id
-                            })
-
-        # 2. Shadows from each existing building onto new buildings
         shadow_conflicts_area_new = 0.0
-        for _, exist_row in existing_gdf.iterrows():
-            exist_geom = exist_row.geometry
-            exist_height = exist_row['height_m']
-            e_name = str(exist_row.name)
-            shadow_geom_exist = compute_shadow_geometry(e_name, exist_geom, exist_height)
-
-            possible_idxs = list(new_sindex.intersection(shadow_geom_exist.bounds))
-            for _, new_row in new_gdf.iloc[possible_idxs].iterrows():
-                new_geom = new_row.geometry
-                new_height = new_row['height_m']
-                new_name = new_row['name']
-                if shadow_geom_exist.intersects(new_geom):
-                    overlap_area = shadow_geom_exist.intersection(new_geom).area
-                    if overlap_area > 0 and exist_height > new_height:
-                        # Existing building (taller) casts shadow on new building
-                        shadow_conflicts_area_new += overlap_area
-                        #for plotting
-                        if new_name in shadow_on_new_buildings:
-                            # combine multiple shadows on the same new building
-                            shadow_on_new_buildings[new_name] = unary_union([
-                                shadow_on_new_buildings[new_name],
-                                shadow_geom_exist
-                            ])
-                        else:
-                            shadow_on_new_buildings[new_name] = shadow_geom_exist
-                        #for reporting
-                                            # For reporting
-                        if new_name not in shadow_on_new_buildings_full:
-                            shadow_on_new_buildings_full[new_name] = []
-
-                        shadow_on_new_buildings_full[new_name].append({
-                            "id": exist_id,
-                            "existing_height": exist_height,
-                            "overlap_area": overlap_area
-                        })
+        new_roof_area = 0.0
+        for terms in building_terms:
+            affected_ids.update(terms["affected_ids"])
+            shadow_conflicts_area_existing += terms["area_existing"]
+            shadow_conflicts_area_new += terms["area_new"]
+            new_roof_area += terms["roof_area"]
 
+        total_roof_area = layer["roof_area"] + new_roof_area
 
         #computing penalties for shadow on building
         total_conflict_area = shadow_conflicts_area_existing + shadow_conflicts_area_new
         penalty_ratio = total_conflict_area / total_roof_area if total_roof_area > 0 else 1.0
 
         area_penalty = min(penalty_ratio * self.S_a, 1.0)
-        total_existing = len(existing_gdf)
+        total_existing = len(layer["height"])
         hit_ratio = (len(affected_ids)*self.S_h) / total_existing if total_existing > 0 else 1.0
         hit_penalty = min(hit_ratio, 1.0)
 
         # Weighted combination of area coverage penalty and number-of-buildings-hit penalty
-        weight_area = 0.4
-        weight_hits = 0.7
-        combined_penalty = weight_area * area_penalty + weight_hits * hit_penalty
+        combined_penalty = self.W_a * area_penalty + self.W_h * hit_penalty
 
         #normalizing and defining fitness score
         fitness_score = 1.0 - combined_penalty
         fitness_score = max(0.0, min(1.0, fitness_score))
 
-        return round(fitness_score, 3), shadowed_by_individual, not_shadowed_by_individual, shadow_on_new_buildings, shadow_conflicts_area_new, shadow_conflicts_area_existing, shadow_on_new_buildings_full  
+        return round(fitness_score, 3)
 
-    def fitness(self, individual):
-        #MOGA: calculating overall fitness as weighted sum of sub-fitnesses
-        
-        #equal weighting for all objectives, insert preferred weighting
-        weight_gfa = 0.1667
-        weight_shadow_nature = 0.1667
-        weight_walk = 0.1667
-        weight_cycle = 0.1667
-        weight_service = 0.1667
-        weight_shadow_building = 0.1667
-
-        gfa_fitness = self.compute_fitness_gfa(individual)
-        shadow_fitness_nature, _ = self.compute_shadow_nature_fitness(individual)
-        walk_fitness = self.compute_walkability_fitness(individual)
-        cycle_fitness = self.compute_cycleability_fitness(individual)
-        service_fitness = (self.compute_serviceavailability_apartments_fitness(individual) + 
-                           self.compute_serviceavailability_offices_fitness(individual)) / 2.0
-        building_shadow_fitness, _, _, _ , _, _, _= self.compute_shadow_building_fitness(individual)
-
-        total_fitness = (
-            weight_gfa * gfa_fitness +
-            weight_shadow_nature * shadow_fitness_nature +
-            weight_walk * walk_fitness +
-            weight_cycle * cycle_fitness +
-            weight_service * service_fitness +
-            weight_shadow_building * building_shadow_fitness
-        )
-        return total_fitness
+    def shadow_building_contribution(self, site_name, height_m):
+        """Shadow conflicts between one new building of height_m on site_name and the existing buildings."""
+        layer = self.context.existing
+        site_geom = self.context.site_geom(site_name)
+        shadowed = []
+        not_shadowed = []
+        affected_ids = set()
 
-    # Genetic operators
-    def crossover(self, parent1, parent2):
-        #combining two parent individuals to produce a child
-        child = {}
+        # 1. Shadows from the new building onto existing buildings (overlaps are tabulated per site and floor count)
+        area_existing = 0.0
+        for exist_pos, overlap_area in self.shadow_table.get(site_name, height_m)["existing_overlaps"]:
+            exist_height = layer["height"][exist_pos]
+            info = {
+                "geometry": layer["footprint"][exist_pos],
+                "existing_height": exist_height,
+                "overlap_area": overlap_area,
+                "id": layer["id"][exist_pos]  # '@id' if present, otherwise index
+            }
+            if height_m > exist_height:
+                # New building overshadows this existing building
+                area_existing += overlap_area
+                shadowed.append(info)
+                affected_ids.add(info["id"])
+            elif height_m < exist_height:
+                # Existing building is taller (new building not causing shadow issue here)
+                not_shadowed.append(info)
+
+        # 2. Shadows from taller existing buildings onto the new building (existing shadows are precomputed once per run)
+        area_new = 0.0
+        shadow_on_new = None
+        shadow_on_new_full = []
+        for exist_pos in sorted(layer["tree"].query(site_geom, predicate="intersects")):
+            exist_height = layer["height"][exist_pos]
+            if not exist_height > height_m:
+                continue
+            shadow_geom_exist = layer["geometry"][exist_pos]
+            overlap_area = shadow_geom_exist.intersection(site_geom).area
+            if overlap_area > 0:
+                area_new += overlap_area
+                #for plotting, multiple shadows on the same new building are combined
+                shadow_on_new = shadow_geom_exist if shadow_on_new is None else unary_union([shadow_on_new, shadow_geom_exist])
+                # For reporting
+                shadow_on_new_full.append({
+                    "id": layer["id"][exist_pos],
+                    "existing_height": exist_height,
+                    "overlap_area": overlap_area
+                })
+
+        return {
+            "roof_area": self.context.site_areas[self.site_index[site_name]],
+            "area_existing": area_existing,
+            "area_new": area_new,
+            "affected_ids": affected_ids,
+            "shadowed": shadowed,
+            "not_shadowed": not_shadowed,
+            "shadow_on_new": shadow_on_new,
+            "shadow_on_new_full": shadow_on_new_full
+        }
 
-        #random choise for which parent contributes heights and which contributes site assignments
-        height_parent = random.choice([1, 2])
-        site_parent = 2 if height_parent == 1 else 1
+    def genome_key(self, individual):
+        #fitness cache key: the Genome itself, dict individuals are encoded (independent of dict order and gfa rounding)
+        return individual if isinstance(individual, Genome) else self.codec.encode(individual)
 
-        for name in self.building_specs:
-            height = parent1[name]["height"] if height_parent == 1 else parent2[name]["height"]
-            site = parent1[name]["site"] if site_parent == 1 else parent2[name]["site"]
+    def evaluate(self, individual):
+        """
+        Returns the full fitness breakdown of an individual (dict or Genome), served from the fitness cache when the genome
+        was seen before.
+        """
+        key = self.genome_key(individual)
+        breakdown = self.fitness_cache.get(key)
+        #bounded breakdowns of the lazy evaluation are replaced by the full one
+        if breakdown is None or breakdown.get("bound"):
+            if isinstance(individual, Genome):
+                individual = self.codec.decode(individual)
+            breakdown = self.compute_fitness_breakdown(individual)
+            self.fitness_cache.put(key, breakdown)
+        return breakdown
+
+    def building_contribution(self, name, values):
+        #the parts of the fitness that only depend on one building's own site and height
+        return {
+            "site": values["site"],
+            "floors": round(values["height"] / self.floor_height, 3),
+            "gfa": self.gfa_score(name, values["site"], values["height"]),
+            "shadow_building": self.shadow_building_terms(values["site"], values["height"])
+        }
 
-            type_ = self.building_specs[name]["type"]
-            floors = height / self.floor_height
+    def shadow_building_terms(self, site_name, height_m):
+        #shadow_building_contribution without the shadowed buildings and geometries (recomputed by the reports)
+        contribution = self.shadow_building_contribution(site_name, height_m)
+        return {name: contribution[name] for name in SHADOW_BUILDING_TERMS}
 
-            #update GFA
-            gfa = self.site_areas[site] * self.footprint_ratio * floors
+    def compute_fitness_breakdown(self, individual, contributions=None, reused=None):
+        #MOGA: calculating overall fitness as weighted sum of sub-fitnesses
+        #contributions: building_contribution results of unchanged buildings, reused: term values known to be unchanged
+        #(both are passed by the DeltaEvaluator, a full evaluation computes everything)
+        contributions = dict(contributions or {})
+        for name, values in individual.items():
+            if name not in contributions:
+                contributions[name] = self.building_contribution(name, values)
+        reused = reused or {}
+
+        gfa_fitness = self.compute_fitness_gfa(individual, contributions)
+        shadow_fitness_nature, area_nature_conflict = reused["shadow_nature"] if "shadow_nature" in reused else self.compute_shadow_nature_fitness(individual)
+        walk_fitness = reused["Walkability"] if "Walkability" in reused else self.compute_walkability_fitness(individual)
+        cycle_fitness = reused["Cycleability"] if "Cycleability" in reused else self.compute_cycleability_fitness(individual)
+        reused_services = reused.get("service_scores", {})
+        service_scores = {
+            building_type: reused_services[building_type] if building_type in reused_services
+            else self.compute_serviceavailability_fitness(individual, building_type)
+            for building_type in self.service_categories
+        }
+        service_fitness = sum(service_scores.values()) / len(service_scores) if service_scores else 0.0
+        service_apartments = service_scores.get(self.serviceavailability_building_type[0], 0.0)
+        service_offices = service_scores.get(self.serviceavailability_building_type[1], 0.0)
+        building_shadow_fitness = self.shadow_building_score([contributions[name]["shadow_building"] for name in individual])
+
+        total_fitness = self.weighted_total({
+            "GFA": gfa_fitness,
+            "Shadow Nature": shadow_fitness_nature,
+            "Walkability": walk_fitness,
+            "Cycleability": cycle_fitness,
+            "Serviceability": service_fitness,
+            "Shadow Buildings": building_shadow_fitness
+        })
+
+        #keys match the fitness_log entries written per generation
+        return {
+            "total_fitness": total_fitness,
+            "GFA": gfa_fitness,
+            "Shadow Nature": shadow_fitness_nature,
+            "Walkability": walk_fitness,
+            "Cycleability": cycle_fitness,
+            "Serviceability": service_fitness,
+            "Shadow Buildings": building_shadow_fitness,
+            "service_scores": service_scores,
+            "service_apartments": service_apartments,
+            "service_offices": service_offices,
+            "area_nature_conflict": area_nature_conflict,
+            "contributions": contributions
+        }
 
-            child[name] = {
-                "site": site,
-                "type": type_,
-                "height": height,
-                "gfa": round(gfa)
-            }
-        return child
+    def weighted_total(self, terms):
+        #weighted sum of the fitness terms, always summed in fitness_weights order
+        total = 0.0
+        for name, weight in self.fitness_weights.items():
+            total += weight * terms[name]
+        return total
 
-    def mutate(self, individual):
-        #randomly adjust height or swap sites between two buildings
-        mutated = copy.deepcopy(individual)
-        building_names = list(mutated.keys())
-        if random.choice([True, False]):
-            # Mutate height of one random building
-            name = random.choice(building_names)
-            current_height = mutated[name].get("height", 0)
-            current_floors = int(round(current_height / self.floor_height)) if current_height else 0
-            delta = random.choice([-3, -2, -1, 1, 2])
-            new_floors = max(1, current_floors + delta)
-            new_height = new_floors * self.floor_height
-            mutated[name]["height"] = new_height
-            site = mutated[name]["site"]
-
-            #update GFA
-            mutated[name]["gfa"] = round(self.site_areas[site] * self.footprint_ratio * new_floors)
-        else:
-            # Mutate by swapping the site assignments of two buildings (if more than one building)
-            if len(building_names) < 2:
-                return mutated  # no swap possible
-            b1, b2 = random.sample(building_names, 2)
-            site1 = mutated[b1]["site"]
-            site2 = mutated[b2]["site"]
-            # Swap sites
-            mutated[b1]["site"], mutated[b2]["site"] = site2, site1
-            # Recalculate GFA for both affected buildings
-            h1 = mutated[b1]["height"]
-            h2 = mutated[b2]["height"]
-            mutated[b1]["gfa"] = round(self.site_areas[site2] * self.footprint_ratio * (h1 / self.floor_height))
-            mutated[b2]["gfa"] = round(self.site_areas[site1] * self.footprint_ratio * (h2 / self.floor_height))
-        
-        return mutated
+    def fitness(self, individual):
+        return self.evaluate(individual)["total_fitness"]
 
-    def select(self, population, fitnesses, k):
-        """Selection: pick the top-k individuals based on fitness (elitism selection)."""
-        top_indices = sorted(range(len(fitnesses)), key=lambda i: fitnesses[i], reverse=True)[:k]
-        return [population[i] for i in top_indices]
+    def evaluate_population(self, population, parents=None):
+        """
+        Fitness breakdowns for a population of Genomes: cached genomes are looked up, children whose parents are cached are
+        delta evaluated (serial backend only), the others are sent to the evaluator backend. parents holds the parent Genomes (or None) per genome.
+        With lazy evaluation, individuals that cannot be selected get bounded breakdowns ("bound": True, see LazyEvaluator).
+        """
+        keys = population
+        parents = parents if parents is not None else [None] * len(population)
+        breakdowns = {}
+        pending = {}
+        lazy = {}
+        #delta evaluation runs in the main process, with a worker pool the children are evaluated by the pool instead
+        delta = self.evaluator is None or not self.evaluator.parallel
+        for key, ind, ind_parents in zip(keys, population, parents):
+            if key in breakdowns or key in pending or key in lazy:
+                continue
+            cached = self.fitness_cache.get(key)
+            if cached is not None and not cached.get("bound"):
+                breakdowns[key] = cached
+                continue
+            if self.lazy_evaluator is not None:
+                lazy[key] = ind_parents
+                continue
+            breakdown = self.delta_evaluate(key, ind_parents) if delta else None
+            if breakdown is not None:
+                breakdowns[key] = breakdown
+            else:
+                pending[key] = ind
+
+        if lazy:
+            #exact totals are only needed for the ranks the selection can still draw, and for the elites
+            survivors = max(self.elites, self.selection.survivors(len(keys)))
+            breakdowns.update(self.lazy_evaluator.evaluate(lazy, keys, breakdowns, survivors))
+        if pending:
+            evaluator = self.evaluator if self.evaluator is not None else SerialEvaluator(self)
+            for key, breakdown in zip(pending, evaluator.map([self.codec.decode(ind) for ind in pending.values()])):
+                self.fitness_cache.put(key, breakdown)
+                breakdowns[key] = breakdown
+        return [breakdowns[key] for key in keys]
+
+    def delta_evaluate(self, key, parents, reused=None):
+        #delta evaluation of genome key from its cached parents, None when no exact parent breakdown is cached
+        #reused: terms already computed for this genome (see compute_fitness_breakdown)
+        if self.delta_evaluator is None:
+            return None
+        parent_breakdowns = [self.fitness_cache.peek(parent) for parent in parents or []]
+        parent_breakdowns = [breakdown for breakdown in parent_breakdowns if breakdown is not None and not breakdown.get("bound")]
+        if not parent_breakdowns:
+            return None
+        breakdown = self.delta_evaluator.evaluate(self.codec.decode(key), parent_breakdowns, reused)
+        self.fitness_cache.put(key, breakdown)
+        return breakdown
+
+    def __getstate__(self):
+        #process-pool workers only need the static evaluation data, not the pool, cache or population
+        state = self.__dict__.copy()
+        state["evaluator"] = None
+        state["delta_evaluator"] = None
+        state["lazy_evaluator"] = None
+        state["parents"] = None
+        state["fitness_cache"] = FitnessCache(0)
+        state["population"] = []
+        return state
+
+    def without_geodata(self):
+        #copy for worker processes that attach to the shared evaluation data (see SharedGeodata and attach_geodata)
+        light = copy.copy(self)
+        for name in ["sites_gdf", "buildings_gdf", "barriers_gdf", "cycle_gdf", "nature_gdf", "services_gdf", "existing_gdf",
+                     "context", "shadow_table", "service_distances"]:
+            light.__dict__[name] = None
+        light.access_analyzer = self.access_analyzer.scoring_copy()
+        return light
+
+    def attach_geodata(self, context, service_distances):
+        #completes a without_geodata copy inside a worker process
+        self.context = context
+        self.site_index = context.site_index
+        self.service_distances = service_distances
+        self.shadow_table = ShadowTable(context, self.floor_height)
+
+    # Genetic operators
+    def crossover(self, parent1, parent2):
+        #combining two parent genomes to produce a child
+        #random choise for which parent contributes heights and which contributes site assignments
+        height_parent = self.random.choice([1, 2])
+        if height_parent == 1:
+            return Genome(parent2.sites, parent1.floors)
+        return Genome(parent1.sites, parent2.floors)
+
+    def mutate(self, genome):
+        #randomly adjust height or swap sites between two buildings, genomes are immutable so a new one is returned
+        n_buildings = len(genome.sites)
+        if self.random.choice([True, False]):
+            # Mutate height of one random building
+            building = self.random.choice(range(n_buildings))
+            delta = self.random.choice([-3, -2, -1, 1, 2])
+            return genome.with_floors(building, max(1, genome.floors[building] + delta))
+        # Mutate by swapping the site assignments of two buildings (if more than one building)
+        if n_buildings < 2:
+            return genome  # no swap possible
+        b1, b2 = self.random.sample(range(n_buildings), 2)
+        return genome.with_swapped_sites(b1, b2)
 
     def plot_individual(self, individual):
         """Plot the configuration of an individual (buildings and their shadows)."""
-        # Create the height dictionary for the candidate
-        height_dict = {values["site"]: values["height"] for values in individual.values()}
-
         # Generate distinct colors for each building in this individual
         names = list(individual.keys())
         cmap = cm.get_cmap("tab20", len(names))
@@ -484,9 +636,14 @@ class UPGA:
         # Prepare plot
         fig, ax = plt.subplots(figsize=(10, 10))
 
-        # Compute and plot shadows from new buildings
-        shadow_gdf = plot_shadow_from_gdf(self.sites_gdf, height_dict=height_dict, 
-                                          azimuth_deg=self.azimuth, altitude_deg=self.altitude, crs=self.crs)
+        # Look up shadows from new buildings in the shadow table (unoccupied sites cast their default shadow with nature_shadow="sites")
+        shadow_rows = [{'name': name, 'geometry': self.shadow_table.get(values["site"], values["height"])["geometry"]}
+                       for name, values in individual.items()]
+        if self.nature_shadow == "sites":
+            occupied = {values["site"] for values in individual.values()}
+            shadow_rows += [{'name': site_name, 'geometry': self.shadow_table.get(site_name, UNOCCUPIED_HEIGHT)["geometry"]}
+                            for site_name in self.context.site_names if site_name not in occupied]
+        shadow_gdf = gpd.GeoDataFrame(shadow_rows, crs=self.crs)
 
         # Plot background layers
         self.nature_gdf.plot(ax=ax, color="green", alpha=0.2, label="Nature")
@@ -556,13 +713,15 @@ class UPGA:
         # Fitness scores
         report_lines.append("\nFitness Evaluation:")
         report_lines.append("-" * 60)
-        gfa_fitness = self.compute_fitness_gfa(individual)
-        shadow_nature_fitness, area_nature_conflict = self.compute_shadow_nature_fitness(individual)
-        walkability = self.compute_walkability_fitness(individual)
-        cycleability = self.compute_cycleability_fitness(individual)
-        service_apartments = self.compute_serviceavailability_apartments_fitness(individual)
-        service_offices = self.compute_serviceavailability_offices_fitness(individual)
-        service_avg = (service_apartments + service_offices) / 2.0
+        breakdown = self.evaluate(individual)
+        gfa_fitness = breakdown["GFA"]
+        shadow_nature_fitness = breakdown["Shadow Nature"]
+        area_nature_conflict = breakdown["area_nature_conflict"]
+        walkability = breakdown["Walkability"]
+        cycleability = breakdown["Cycleability"]
+        service_apartments = breakdown["service_apartments"]
+        service_offices = breakdown["service_offices"]
+        service_avg = breakdown["Serviceability"]
         (
             shadow_new_fitness,
             shadowed_info,
@@ -585,7 +744,7 @@ class UPGA:
             
         ]
 
-        total_score = self.fitness(individual)
+        total_score = breakdown["total_fitness"]
         report_lines.append(f"\nTotal Fitness Score: {total_score:.3f}")
 
 
@@ -698,56 +857,63 @@ class UPGA:
         for site_name, area in self.site_areas.items():
             print(f"Site {site_name}: {area} m²")
 
-        for gen in range(self.generations):
-            fitnesses = [self.fitness(ind) for ind in self.population]
-            elite_idx = max(range(len(fitnesses)), key=lambda i: fitnesses[i])
-            elites = [self.population[elite_idx]]
-
-            #elitism locig: carry forward the best individual unchanged
-            new_pop = elites.copy()
-
-            #continue until population size is restored
-            while len(new_pop) < self.popsize:
-                parents = self.select(self.population, fitnesses, 2)
-                child = self.crossover(parents[0], parents[1])
-                if random.random() < self.mutProb:
-                    child = self.mutate(child)
-                new_pop.append(child)
-            self.population = new_pop
-
-            best_fit = fitnesses[elite_idx]
-            print(f" Generation {gen+1} best fitness: {best_fit:.4f}")
-            generations_list.append(round(best_fit, 4))
-
-            #for analysing fitness scores for each fitness function
-            best_individual = self.population[elite_idx]
-            fitness_gfa = self.compute_fitness_gfa(best_individual)
-            fitness_shadow_nature, _ = self.compute_shadow_nature_fitness(best_individual)
-            fitness_walk = self.compute_walkability_fitness(best_individual)
-            fitness_cycle = self.compute_cycleability_fitness(best_individual)
-            fitness_services = (
-                self.compute_serviceavailability_apartments_fitness(best_individual) + 
-                self.compute_serviceavailability_offices_fitness(best_individual)
-            ) / 2.0
-            fitness_shadow_building, *_ = self.compute_shadow_building_fitness(best_individual)
-
-            #log all fitness data for this generation
-            fitness_log.append({
-                "generation": gen + 1,
-                "total_fitness": best_fit,
-                "GFA": fitness_gfa,
-                "Shadow Nature": fitness_shadow_nature,
-                "Walkability": fitness_walk,
-                "Cycleability": fitness_cycle,
-                "Serviceability": fitness_services,
-                "Shadow Buildings": fitness_shadow_building
-            })
-
-        self.write_fitness_evaluation_report(fitness_log)
-
-        #identifying the best individual
-        best = self.population[max(range(len(self.population)), key=lambda i: self.fitness(self.population[i]))]
+        #population evaluation backend, worker processes receive the static evaluation data once here
+        self.evaluator = make_evaluator(self, self.backend, self.workers, self.shared_geodata)
+        try:
+            for gen in range(self.generations):
+                fitnesses = [breakdown["total_fitness"] for breakdown in self.evaluate_population(self.population, self.parents)]
+                ranked = self.selection.rank(fitnesses)
+                elite_idx = ranked[0]
+                best_genome = self.population[elite_idx]
+                elites = [self.population[i] for i in ranked[:self.elites]]
+
+                #elitism locig: carry forward the best individuals unchanged
+                new_pop = elites.copy()
+                new_parents = [None] * len(new_pop)
+
+                #continue until population size is restored
+                while len(new_pop) < self.popsize:
+                    parents = [self.population[i] for i in self.selection.draw(self.random, 2)]
+                    child = self.crossover(parents[0], parents[1])
+                    if self.random.random() < self.mutProb:
+                        child = self.mutate(child)
+                    new_pop.append(child)
+                    new_parents.append(parents)
+                self.population = new_pop
+                self.parents = new_parents
+
+                best_fit = fitnesses[elite_idx]
+                print(f" Generation {gen+1} best fitness: {best_fit:.4f}")
+                generations_list.append(round(best_fit, 4))
+
+                #for analysing fitness scores for each fitness function (served from the fitness cache)
+                best_breakdown = self.evaluate(best_genome)
+
+                #log all fitness data for this generation
+                fitness_log.append({
+                    "generation": gen + 1,
+                    "total_fitness": best_fit,
+                    "GFA": best_breakdown["GFA"],
+                    "Shadow Nature": best_breakdown["Shadow Nature"],
+                    "Walkability": best_breakdown["Walkability"],
+                    "Cycleability": best_breakdown["Cycleability"],
+                    "Serviceability": best_breakdown["Serviceability"],
+                    "Shadow Buildings": best_breakdown["Shadow Buildings"]
+                })
+
+            self.write_fitness_evaluation_report(fitness_log)
+
+            #identifying the best individual
+            final_fitnesses = [breakdown["total_fitness"] for breakdown in self.evaluate_population(self.population, self.parents)]
+        finally:
+            self.evaluator.close()
+            self.evaluator = None
+        best = self.codec.decode(self.population[max(range(len(self.population)), key=lambda i: final_fitnesses[i])])
         self.best_individual = best
+        return self.report_best(best, generations_list)
+
+    def report_best(self, best, generations_list=None):
+        #prints, reports and plots the best individual, returns the building and site maps used by GAIA
 
         #preparing returned values
         urban_result = {}       # maps building name to values 
@@ -759,13 +925,13 @@ class UPGA:
             }
             site_to_building[values["site"]] = name
 
-        # Compute detailed fitness breakdown for the best individual
-        fitness_gfa = self.compute_fitness_gfa(best)
-        fitness_shadow_nature,_ = self.compute_shadow_nature_fitness(best)
-        fitness_walk = self.compute_walkability_fitness(best)
-        fitness_cycle = self.compute_cycleability_fitness(best)
-        fitness_services = (self.compute_serviceavailability_apartments_fitness(best) + 
-                             self.compute_serviceavailability_offices_fitness(best)) / 2.0
+        # Detailed fitness breakdown for the best individual
+        best_breakdown = self.evaluate(best)
+        fitness_gfa = best_breakdown["GFA"]
+        fitness_shadow_nature = best_breakdown["Shadow Nature"]
+        fitness_walk = best_breakdown["Walkability"]
+        fitness_cycle = best_breakdown["Cycleability"]
+        fitness_services = best_breakdown["Serviceability"]
         fitness_shadow_building, shadowed_info, non_shadowed_info, _ , _, _, _= self.compute_shadow_building_fitness(best)
 
         #Print best individual's configuration and fitness breakdown
@@ -796,11 +962,22 @@ class UPGA:
                 #print(f"   • ID: {data['id']}, height: {data['existing_height']}")
 
         # Optional: print fitness trend
-        if self.PlotRun:
+        if self.PlotRun and generations_list is not None:
             print("fitness_setX =", generations_list)  
 
-        total_score = self.fitness(best)
+        total_score = best_breakdown["total_fitness"]
         print(f"\nTotal fitness: {total_score:.3f}")
+
+        cache_stats = self.fitness_cache.stats()
+        print(f"Fitness cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+              f"{cache_stats['evictions']} evictions ({cache_stats['hit_rate']*100:.1f}% hit rate)")
+        if self.lazy_evaluator is not None:
+            lazy_stats = self.lazy_evaluator.stats()
+            print(f"Lazy evaluation: {lazy_stats['bounded']} of {lazy_stats['bounded'] + lazy_stats['evaluations']} children "
+                  f"bounded ({lazy_stats['bounded_rate']*100:.1f}%)")
+        if self.delta_evaluator is not None:
+            delta_stats = self.delta_evaluator.stats()
+            print(f"Delta evaluation: {delta_stats['evaluations']} children, {delta_stats['reuse_rate']*100:.1f}% of building terms reused")
         if self.output_path != None:
             self.write_evaluation_report(self.output_path, best)
 
@@ -809,3 +986,54 @@ class UPGA:
             self.plot_individual(best)
         return urban_result, site_to_building
 
+    def floor_range(self, max_floors=None):
+        #floor counts searched by solve_exact: 1 to max_floors, by default at least 7 (the initial range) and every ideal floor count
+        if max_floors is None:
+            ideal_floors = [spec["target_gfa"] // (area * self.footprint_ratio)
+                            for spec in self.building_specs.values() for area in self.site_areas.values() if area > 0]
+            max_floors = int(max([7] + ideal_floors))
+        return max_floors
+
+    def search_space_size(self, max_floors=None):
+        """Number of distinct genomes (site assignments x floor counts) with 1 to max_floors floors per building."""
+        return search_space_size(len(self.sites_gdf), len(self.building_specs), self.floor_range(max_floors))
+
+    def solve_exact(self, max_floors=None, threshold=2_000_000, top_n=5, workers=None):
+        """
+        Enumerates every genome with 1 to max_floors floors per building when the search space has at most threshold genomes.
+        Returns {"best", "fitness", "breakdown", "alternatives", "search_space"} with the provably best individual and the
+        next top_n - 1 individuals, or None when the search space is too large (use run() instead).
+        """
+        if len(self.sites_gdf) < len(self.building_specs):
+            raise ValueError("Not enough unique sites to assign each building.")
+        max_floors = self.floor_range(max_floors)
+        size = self.search_space_size(max_floors)
+        print(f"UPGA search space: {size} genomes ({len(self.building_specs)} buildings, {len(self.sites_gdf)} sites, 1-{max_floors} floors)")
+        if size > threshold:
+            print(f"Search space exceeds the exact solver threshold of {threshold} genomes, use run() instead")
+            return None
+
+        #every term is tabulated per (building, site, floors), the genomes are then scored in chunks
+        solver = ExactSolver(self, max_floors)
+        workers = workers if workers is not None else self.workers
+        ranked = solver.solve(top_n=top_n, workers=workers)
+
+        solutions = []
+        for total_fitness, sites, floors in ranked:
+            individual = self.codec.decode(Genome(sites, [solver.floors[floor_idx] for floor_idx in floors]))
+            solutions.append({"individual": individual, "fitness": total_fitness, "breakdown": self.evaluate(individual)})
+
+        for rank, solution in enumerate(solutions, start=1):
+            layout = ", ".join(f"{name}: {values['site']} ({round(values['height'] / self.floor_height)} floors)"
+                               for name, values in solution["individual"].items())
+            print(f" {rank}. fitness {solution['fitness']:.4f} - {layout}")
+
+        best = solutions[0]
+        self.best_individual = best["individual"]
+        return {
+            "best": best["individual"],
+            "fitness": best["fitness"],
+            "breakdown": best["breakdown"],
+            "alternatives": solutions[1:],
+            "search_space": size
+        }
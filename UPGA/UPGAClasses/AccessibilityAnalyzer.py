@@ -1,12 +1,21 @@
 ##### AccessibilityAnalyzer ###
 #this class is used in the fitness functions for walkability and cycleability in the UPGA
 
-from shapely.geometry import LineString
+import hashlib
+import json
+import os
+
+import numpy as np
+import shapely
 from shapely.ops import unary_union
 import geopandas as gpd
 
+#bump when the scoring below changes, so saved tables are recomputed
+ACCESS_TABLE_VERSION = 1
+
 class AccessibilityAnalyzer:
-    def __init__(self, sites_gdf, buildings_gdf, nature_gdf, barriers_gdf, cycle_gdf, accessability_building_type="school", D_max=500, k_n, k_b):
+    def __init__(self, sites_gdf, buildings_gdf, nature_gdf, barriers_gdf, cycle_gdf, accessability_building_type="school", D_max=500, k_n=None, k_b=None, table_dir=None,
+                 cycle_buffer_distance=10, cycle_raster_resolution=None, bulk_walk=True):
         self.sites_gdf = sites_gdf
         self.buildings_gdf = buildings_gdf
         self.nature_gdf = nature_gdf
@@ -14,8 +23,8 @@ class AccessibilityAnalyzer:
         self.cycle_gdf = cycle_gdf
         self.accessability_building_type = accessability_building_type
         self.D_max = D_max
-        self.k_n = k_n
-        self.k_b = k_b
+        self.k_n = k_n if k_n is not None else len(nature_gdf)
+        self.k_b = k_b if k_b is not None else len(barriers_gdf)
 
         
         #ensure 'highway' column exists before filtering
@@ -35,6 +44,87 @@ class AccessibilityAnalyzer:
         self.nature_index = self.nature_gdf.sindex
         self.highway_index = self.highways.sindex
         self.railway_index = self.railways.sindex
+        #walk crossings are counted for all segments at once, bulk_walk=False keeps the per-line queries
+        self.bulk_walk = bulk_walk
+
+        #buffered cycle network, built once and prepared for repeated intersection tests
+        self.cycle_buffer_distance = cycle_buffer_distance
+        self.cycle_buffer = unary_union(self.cycle_gdf.geometry).buffer(cycle_buffer_distance)
+        shapely.prepare(self.cycle_buffer)
+        #optional rasterized variant (cell size in metres): approximate, but cheaper on large networks
+        self.cycle_raster_resolution = cycle_raster_resolution
+        self.cycle_field = self.build_cycle_distance_field(cycle_raster_resolution) if cycle_raster_resolution else None
+
+        #residential origins and site centroids (destinations) are fixed for the run
+        res_types = ["house", "apartments", "residential", "dormitory", "semidetached_house", "terrace"]
+        self.home_buildings = self.buildings_gdf[self.buildings_gdf["building"].isin(res_types)]
+        self.home_centroids = self.home_buildings.geometry.centroid.tolist()
+        self.site_centroids = dict(zip(self.sites_gdf["name"], self.sites_gdf.geometry.centroid))
+
+        #the score of a destination only depends on its site: tabulate (score sum, origin count) per site and mode
+        self.table_dir = table_dir
+        #hashing every layer is not free, the fingerprint is computed once and reused for the path, load check and save
+        self._fingerprint = self.fingerprint() if table_dir is not None else None
+        self.access_table = self.load_access_table()
+        if self.access_table is None:
+            self.access_table = self.build_access_table()
+            self.save_access_table()
+
+    def fingerprint(self):
+        #hash of everything the table depends on, used to reuse saved tables on the same dataset
+        digest = hashlib.sha256()
+        digest.update(json.dumps([ACCESS_TABLE_VERSION, float(self.D_max), self.k_n, self.k_b,
+                                  self.cycle_buffer_distance, self.cycle_raster_resolution]).encode())
+        digest.update(json.dumps([str(name) for name in self.site_centroids]).encode())
+        for geoms in [self.sites_gdf.geometry, self.home_buildings.geometry, self.nature_gdf.geometry,
+                      self.highways.geometry, self.railways.geometry, self.cycle_gdf.geometry]:
+            for wkb in shapely.to_wkb(geoms.values):
+                digest.update(wkb)
+        return digest.hexdigest()
+
+    def table_path(self):
+        if self.table_dir is None:
+            return None
+        return os.path.join(self.table_dir, f"accessibility_table_{self._fingerprint[:16]}.json")
+
+    def load_access_table(self):
+        path = self.table_path()
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path) as file:
+            saved = json.load(file)
+        if saved.get("fingerprint") != self._fingerprint:
+            return None
+        print(f"Accessibility table loaded from {path}")
+        return {mode: {site: tuple(values) for site, values in saved[mode].items()} for mode in ["walk", "cycle"]}
+
+    def save_access_table(self):
+        path = self.table_path()
+        if path is None:
+            return
+        os.makedirs(self.table_dir, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump({"fingerprint": self._fingerprint, **self.access_table}, file, indent=2)
+        print(f"Accessibility table saved to {path}")
+
+    def build_access_table(self):
+        #all (origin, site) segments are scored in bulk, then summed per site
+        site_names = list(self.site_centroids)
+        lines, segment_site = self.od_segments(site_names)
+        table = {}
+        for mode in ["walk", "cycle"]:
+            scores = self.segment_scores(lines, mode)
+            totals = np.bincount(segment_site, weights=scores, minlength=len(site_names))
+            counts = np.bincount(segment_site, minlength=len(site_names))
+            table[mode] = {name: (float(totals[i]), int(counts[i])) for i, name in enumerate(site_names)}
+        return table
+
+    def scoring_copy(self):
+        #analyzer that only scores configurations from the access table, without the geodata used to build it (for worker processes)
+        analyzer = object.__new__(AccessibilityAnalyzer)
+        analyzer.accessability_building_type = self.accessability_building_type
+        analyzer.access_table = self.access_table
+        return analyzer
 
     def compute_walkability_score(self, individual):
         return self._compute_access_score(individual, mode="walk")
@@ -43,67 +133,133 @@ class AccessibilityAnalyzer:
         return self._compute_access_score(individual, mode="cycle")
 
     def _compute_access_score(self, individual, mode="walk"):
+        #average score over all (residential origin, destination) pairs of this configuration, read from the table
+        if mode not in self.access_table:
+            raise ValueError(f"Unsupported access mode: {mode}")
         total_score = 0
         count = 0
+        for b in individual.values():
+            if b["type"] == self.accessability_building_type:
+                site_total, site_count = self.access_table[mode][b["site"]]
+                total_score += site_total
+                count += site_count
 
-        #destination centroids 
-        dest_centroids = {
-            name: self.sites_gdf[self.sites_gdf["name"] == b["site"]].geometry.iloc[0].centroid
-            for name, b in individual.items()
-            if b["type"] == self.accessability_building_type
-        }
+        return round(total_score / count, 3) if count > 0 else 0.0
 
-        #residential origins
-        res_types = ["house", "apartments", "residential", "dormitory", "semidetached_house", "terrace"]
-        home_buildings = self.buildings_gdf[self.buildings_gdf["building"].isin(res_types)]
+    def od_segments(self, site_names):
+        #one straight line per (residential origin, destination site), zero-length lines are skipped
+        origin_xy = np.array([(p.x, p.y) for p in self.home_centroids]).reshape(-1, 2)
+        lines = []
+        segment_site = []
+        for i, site_name in enumerate(site_names):
+            dest = self.site_centroids[site_name]
+            coords = np.stack([origin_xy, np.broadcast_to([dest.x, dest.y], origin_xy.shape)], axis=1)
+            site_lines = shapely.linestrings(coords)
+            site_lines = site_lines[shapely.length(site_lines) > 0]
+            lines.append(site_lines)
+            segment_site.append(np.full(len(site_lines), i))
+        if not lines:
+            return np.empty(0, dtype=object), np.empty(0, dtype=int)
+        return np.concatenate(lines), np.concatenate(segment_site)
 
-        for _, home in home_buildings.iterrows():
-            origin = home.geometry.centroid
+    def segment_scores(self, lines, mode="walk"):
+        #score of every origin-destination segment: weighted distance and connectivity scores
+        lengths = shapely.length(lines)
+        D_score = np.maximum(0, 1 - (lengths / self.D_max))
 
-            for _, dest in dest_centroids.items():
-                line = LineString([origin, dest])
-                if line.length == 0:
-                    continue
+        if mode == "walk":
+            if self.bulk_walk:
+                C_score = self.walk_connectivity_bulk(lines)
+            else:
+                C_score = np.array([self._walk_connectivity(line) for line in lines], dtype=float)
+        elif mode == "cycle":
+            length_inside = self.cycle_lengths_inside(lines)
+            C_score = np.divide(length_inside, lengths, out=np.zeros_like(lengths), where=lengths > 0)
+        else:
+            raise ValueError(f"Unsupported access mode: {mode}")
 
-                D_score = max(0, 1 - (line.length / self.D_max))
+        W_d = 0.5
+        W_c = 0.5
 
-                if mode == "walk":
-                    #fast bounding-box filtering with spatial index
-                    nature_idx = list(self.nature_index.intersection(line.bounds))
-                    nature_hits = self.nature_gdf.iloc[nature_idx]
-                    nature_hits = nature_hits[nature_hits.geometry.intersects(line)]
+        raw_score = W_d * D_score + W_c * C_score
+        return np.minimum(1.0, np.maximum(0.0, raw_score))
 
-                    highway_idx = list(self.highway_index.intersection(line.bounds))
-                    highway_hits = self.highways.iloc[highway_idx]
-                    highway_hits = highway_hits[highway_hits.geometry.intersects(line)]
+    def walk_connectivity_bulk(self, lines):
+        #same score as _walk_connectivity, with one STRtree query per layer for all lines
+        n_lines = len(lines)
+        nature_hits = np.bincount(self.nature_index.query(lines, predicate="intersects")[0], minlength=n_lines)
+        highway_hits = np.bincount(self.highway_index.query(lines, predicate="intersects")[0], minlength=n_lines)
+        railway_hits = np.bincount(self.railway_index.query(lines, predicate="intersects")[0], minlength=n_lines)
 
-                    railway_idx = list(self.railway_index.intersection(line.bounds))
-                    railway_hits = self.railways.iloc[railway_idx]
-                    railway_hits = railway_hits[railway_hits.geometry.intersects(line)]
+        barrier_hits = (highway_hits + railway_hits) / 2
+        nature_score = np.minimum(1, nature_hits / self.k_n)
+        barrier_score = np.minimum(1, barrier_hits / self.k_b)
 
-                    barrier_hits = (len(highway_hits) + len(railway_hits)) / 2
-                    nature_score = min(1, len(nature_hits) / self.k_n)
-                    barrier_score = min(1, barrier_hits / self.k_b)
+        return np.maximum(0, nature_score - barrier_score)
 
-                    C_score = max(0, nature_score - barrier_score)
+    def _walk_connectivity(self, line):
+        #per-line reference implementation (bulk_walk=False)
+        #fast bounding-box filtering with spatial index
+        nature_idx = list(self.nature_index.intersection(line.bounds))
+        nature_hits = self.nature_gdf.iloc[nature_idx]
+        nature_hits = nature_hits[nature_hits.geometry.intersects(line)]
 
-                elif mode == "cycle":
-                    cycle_buffer = unary_union(self.cycle_gdf.geometry).buffer(10)
-                    intersection = line.intersection(cycle_buffer)
-                    length_inside = intersection.length
-                    length_total = line.length
-                    C_score = length_inside / length_total if length_total > 0 else 0.0
+        highway_idx = list(self.highway_index.intersection(line.bounds))
+        highway_hits = self.highways.iloc[highway_idx]
+        highway_hits = highway_hits[highway_hits.geometry.intersects(line)]
 
-                else:
-                    raise ValueError(f"Unsupported access mode: {mode}")
-                
-                W_d = 0.5
-                W_c = 0.5
+        railway_idx = list(self.railway_index.intersection(line.bounds))
+        railway_hits = self.railways.iloc[railway_idx]
+        railway_hits = railway_hits[railway_hits.geometry.intersects(line)]
 
-                raw_score = W_d * D_score + W_c * C_score
-                score = min(1.0, max(0.0, raw_score))
+        barrier_hits = (len(highway_hits) + len(railway_hits)) / 2
+        nature_score = min(1, len(nature_hits) / self.k_n)
+        barrier_score = min(1, barrier_hits / self.k_b)
 
-                total_score += score
-                count += 1
+        return max(0, nature_score - barrier_score)
 
-        return round(total_score / count, 3) if count > 0 else 0.0
+    def build_cycle_distance_field(self, resolution):
+        #raster of cells whose centre lies within the buffer distance of the cycle network
+        minx, miny, maxx, maxy = self.cycle_buffer.bounds
+        xs = np.arange(minx + resolution / 2, maxx, resolution)
+        ys = np.arange(miny + resolution / 2, maxy, resolution)
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        cells = shapely.points(grid_x.ravel(), grid_y.ravel())
+        cycle_tree = shapely.STRtree(self.cycle_gdf.geometry.values)
+        cell_hits, _ = cycle_tree.query(cells, predicate="dwithin", distance=self.cycle_buffer_distance)
+        inside = np.zeros(len(cells), dtype=bool)
+        inside[cell_hits] = True
+        return {"origin": (minx, miny), "resolution": resolution, "inside": inside.reshape(grid_x.shape)}
+
+    def cycle_lengths_inside(self, lines):
+        #length of every line inside the buffered cycle network, computed for all lines at once
+        if len(lines) == 0:
+            return np.zeros(0)
+        if self.cycle_field is not None:
+            return self._raster_lengths_inside(lines)
+
+        length_inside = np.zeros(len(lines))
+        hits = shapely.intersects(lines, self.cycle_buffer)
+        length_inside[hits] = shapely.length(shapely.intersection(lines[hits], self.cycle_buffer))
+        return length_inside
+
+    def _raster_lengths_inside(self, lines):
+        #approximate variant: fraction of evenly spaced samples along each line that fall in buffered cells
+        field = self.cycle_field
+        resolution = field["resolution"]
+        lengths = shapely.length(lines)
+        n_samples = np.maximum(2, np.ceil(2 * lengths / resolution).astype(int))
+        line_of_sample = np.repeat(np.arange(len(lines)), n_samples)
+        first_sample = np.cumsum(n_samples) - n_samples
+        fractions = (np.arange(n_samples.sum()) - first_sample[line_of_sample] + 0.5) / n_samples[line_of_sample]
+        samples = shapely.get_coordinates(shapely.line_interpolate_point(lines[line_of_sample], fractions, normalized=True))
+
+        cols = np.floor((samples[:, 0] - field["origin"][0]) / resolution).astype(int)
+        rows = np.floor((samples[:, 1] - field["origin"][1]) / resolution).astype(int)
+        n_rows, n_cols = field["inside"].shape
+        on_grid = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+        sample_inside = np.zeros(len(samples), dtype=bool)
+        sample_inside[on_grid] = field["inside"][rows[on_grid], cols[on_grid]]
+
+        inside_fraction = np.bincount(line_of_sample, weights=sample_inside, minlength=len(lines)) / n_samples
+        return lengths * inside_fraction
@@ -0,0 +1,71 @@
+##### DeltaEvaluator.py ###
+#this class is used in the UPGA to evaluate children from the cached breakdown of a parent
+#mutation and crossover only change the site or floor count of some buildings, so only the terms of those buildings are
+#recomputed: per-building GFA and shadow contributions, accessibility/service terms only when a relevant site moved
+#the shadow on nature term depends on all shadows together and is always recomputed, unless the caller already knows it
+
+class DeltaEvaluator:
+    def __init__(self, upga, debug=False):
+        self.upga = upga
+        #debug mode cross-checks every delta evaluation against a full evaluation
+        self.debug = debug
+        self.evaluations = 0
+        self.reused_buildings = 0
+        self.recomputed_buildings = 0
+
+    def changed_buildings(self, individual, parent_breakdown):
+        #buildings whose site or floor count differs from the parent
+        contributions = parent_breakdown["contributions"]
+        return [name for name, values in individual.items()
+                if name not in contributions
+                or contributions[name]["site"] != values["site"]
+                or contributions[name]["floors"] != round(values["height"] / self.upga.floor_height, 3)]
+
+    def evaluate(self, individual, parent_breakdowns, known=None):
+        """
+        Fitness breakdown of individual, computed from the parent breakdown that differs in the fewest buildings.
+        known holds terms already computed for the individual itself, they are used as they are.
+        """
+        parent_breakdown, changed = min(
+            ((breakdown, self.changed_buildings(individual, breakdown)) for breakdown in parent_breakdowns),
+            key=lambda candidate: len(candidate[1])
+        )
+        upga = self.upga
+        moved = {name for name in changed if parent_breakdown["contributions"].get(name, {}).get("site") != individual[name]["site"]}
+
+        #terms that only depend on the sites of some building types are kept while none of those buildings moved
+        reused = {}
+        if not any(individual[name]["type"] == upga.accessability_building_type for name in moved):
+            reused["Walkability"] = parent_breakdown["Walkability"]
+            reused["Cycleability"] = parent_breakdown["Cycleability"]
+        reused["service_scores"] = {
+            building_type: score for building_type, score in parent_breakdown["service_scores"].items()
+            if not any(individual[name]["type"] == building_type for name in moved)
+        }
+        reused.update(known or {})
+        contributions = {name: contribution for name, contribution in parent_breakdown["contributions"].items()
+                         if name in individual and name not in changed}
+
+        breakdown = upga.compute_fitness_breakdown(individual, contributions, reused)
+        self.evaluations += 1
+        self.reused_buildings += len(contributions)
+        self.recomputed_buildings += len(individual) - len(contributions)
+
+        if self.debug:
+            self.check(individual, breakdown)
+        return breakdown
+
+    def check(self, individual, breakdown):
+        full = self.upga.compute_fitness_breakdown(individual)
+        for key in ["total_fitness", "GFA", "Shadow Nature", "Walkability", "Cycleability", "Serviceability", "Shadow Buildings"]:
+            if breakdown[key] != full[key]:
+                raise RuntimeError(f"Delta evaluation mismatch for {key}: {breakdown[key]} (delta) != {full[key]} (full), individual {individual}")
+
+    def stats(self):
+        buildings = self.reused_buildings + self.recomputed_buildings
+        return {
+            "evaluations": self.evaluations,
+            "reused_buildings": self.reused_buildings,
+            "recomputed_buildings": self.recomputed_buildings,
+            "reuse_rate": self.reused_buildings / buildings if buildings > 0 else 0.0
+        }
@@ -0,0 +1,129 @@
+##### EvaluationContext.py ###
+#this class is used by the UPGA fitness functions, the shadow table and the exact solver
+#it holds everything the fitness terms read from geo_data: filtered layers, site geometries and centroids indexed by
+#site name, the prepared nature union, STRtrees and total areas, built once per run and read-only afterwards
+
+import numpy as np
+from shapely import STRtree
+from shapely.ops import unary_union
+from shapely.prepared import prep
+
+from UPGA.UPGAClasses.ShadowAnalyzer import calculate_shadow_geometries
+
+
+def read_only(array):
+    array = np.asarray(array)
+    array.flags.writeable = False
+    return array
+
+
+class EvaluationContext:
+    def __init__(self, geo_data, azimuth, altitude, crs=None):
+        self.crs = crs
+        self.azimuth = azimuth
+        self.altitude = altitude
+
+        #sites, row i of every site array belongs to site_names[i]
+        sites_gdf = geo_data["sites"]
+        self.site_names = tuple(sites_gdf["name"])
+        self.site_index = {name: i for i, name in enumerate(self.site_names)}
+        self.site_geoms = read_only(np.array(list(sites_gdf.geometry), dtype=object))
+        centroids = sites_gdf.geometry.centroid
+        self.site_centroids = read_only(np.column_stack([centroids.x, centroids.y]))
+        self.site_areas = read_only(np.array([geom.area for geom in self.site_geoms]))
+
+        #polygonal nature zones, one by one (the default nature penalty sums over them) and merged into one geometry
+        nature_gdf = geo_data["nature"]
+        nature_polygons = nature_gdf[nature_gdf.geometry.type.isin(['Polygon', 'MultiPolygon'])]
+        self.nature_polygons = read_only(np.array(list(nature_polygons.geometry), dtype=object))
+        self.nature_tree = STRtree(self.nature_polygons)
+        self.nature_union = unary_union(nature_polygons.geometry.values)
+        self.total_nature_area = nature_polygons.geometry.area.sum()
+
+        #existing polygon buildings with their shadows (sun angles and existing heights are fixed)
+        self.existing = self.build_existing_layer(geo_data["existing"])
+
+        #service centroids and the attribute columns the service categories filter on
+        services_gdf = geo_data["services"]
+        service_centroids = services_gdf.geometry.centroid
+        self.service_centroids = read_only(np.column_stack([service_centroids.x, service_centroids.y]))
+        self.service_columns = {column: read_only(services_gdf[column].to_numpy())
+                                for column in services_gdf.columns if column != services_gdf.geometry.name}
+
+        #max distance in the area (for walkability/cycleability/service scaling)
+        minx, miny, maxx, maxy = geo_data["buildings"].total_bounds
+        self.D_max = max(maxx - minx, maxy - miny)
+
+        self.prepare()
+        self._frozen = True
+
+    @classmethod
+    def from_parts(cls, **parts):
+        """Context from already extracted attributes (see SharedGeodata), the STRtrees and prepared geometries are rebuilt."""
+        context = cls.__new__(cls)
+        for name, value in parts.items():
+            object.__setattr__(context, name, value)
+        object.__setattr__(context, "site_index", {name: i for i, name in enumerate(context.site_names)})
+        existing = dict(context.existing)
+        existing["tree"] = STRtree(existing["geometry"])
+        existing["footprint_tree"] = STRtree(existing["footprint"])
+        object.__setattr__(context, "existing", existing)
+        object.__setattr__(context, "nature_tree", STRtree(context.nature_polygons))
+        for array in [context.site_geoms, context.nature_polygons, existing["geometry"], existing["footprint"]]:
+            array.flags.writeable = False
+        context.prepare()
+        object.__setattr__(context, "_frozen", True)
+        return context
+
+    def build_existing_layer(self, existing_gdf):
+        """
+        Computes the shadow of every existing building once per run.
+        Returns a dict with one shadow geometry per existing polygon building, its source height and id,
+        and STRtrees over the shadows and footprints for querying candidate sites.
+        """
+        existing_gdf = existing_gdf[existing_gdf.geometry.type.isin(['Polygon', 'MultiPolygon'])]
+        heights = existing_gdf['height'].astype(float).to_numpy()
+        if "@id" in existing_gdf.columns:
+            ids = existing_gdf["@id"].tolist()
+        else:
+            ids = existing_gdf.index.tolist()
+
+        #one vectorized pass over all existing buildings (missing heights cast the ShadowAnalyzer default of 15 m)
+        shadow_geoms = calculate_shadow_geometries(
+            existing_gdf.geometry.values, np.nan_to_num(heights, nan=15.0), self.azimuth, self.altitude
+        )
+
+        footprints = existing_gdf.geometry.to_numpy()
+        return {
+            "geometry": read_only(shadow_geoms),
+            "height": read_only(heights),
+            "id": tuple(ids),
+            "tree": STRtree(shadow_geoms),
+            "footprint": read_only(footprints),
+            "footprint_tree": STRtree(footprints),
+            "roof_area": existing_gdf.geometry.area.sum()
+        }
+
+    def prepare(self):
+        #prepared geometries cannot be pickled, they are rebuilt after unpickling
+        object.__setattr__(self, "nature_prepared", prep(self.nature_union))
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"EvaluationContext is read-only, cannot set {name}")
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["nature_prepared"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for array in [self.site_geoms, self.site_centroids, self.site_areas, self.nature_polygons, self.service_centroids, *self.service_columns.values(),
+                      self.existing["geometry"], self.existing["height"], self.existing["footprint"]]:
+            array.flags.writeable = False
+        self.prepare()
+
+    def site_geom(self, site_name):
+        return self.site_geoms[self.site_index[site_name]]
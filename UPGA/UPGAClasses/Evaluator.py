@@ -0,0 +1,84 @@
+##### Evaluator.py ###
+#this module holds the population evaluation backends used by the UPGA
+#every backend maps UPGA.compute_fitness_breakdown over a list of individuals and returns the breakdowns in order
+#parallel backends get every uncached child, the UPGA only delta evaluates children in the main process for serial ones
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from UPGA.UPGAClasses.SharedGeodata import SharedGeodata, attach
+
+class SerialEvaluator:
+    parallel = False
+
+    def __init__(self, upga):
+        self.upga = upga
+
+    def map(self, individuals):
+        return [self.upga.compute_fitness_breakdown(individual) for individual in individuals]
+
+    def close(self):
+        pass
+
+
+class ThreadPoolEvaluator:
+    parallel = True
+
+    def __init__(self, upga, workers):
+        self.upga = upga
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def map(self, individuals):
+        return list(self.executor.map(self.upga.compute_fitness_breakdown, individuals))
+
+    def close(self):
+        self.executor.shutdown()
+
+
+#UPGA instance of a worker process, set once by the pool initializer
+_worker_upga = None
+#shared memory block the worker's evaluation data points into, kept open for the worker's lifetime
+_worker_shm = None
+
+def _init_worker(upga, handle=None):
+    global _worker_upga, _worker_shm
+    if handle is not None:
+        _worker_shm, context, tables = attach(handle)
+        upga.attach_geodata(context, tables["service_distances"])
+    _worker_upga = upga
+
+def _evaluate_in_worker(individual):
+    return _worker_upga.compute_fitness_breakdown(individual)
+
+
+class ProcessPoolEvaluator:
+    parallel = True
+
+    def __init__(self, upga, workers, shared=True):
+        #the UPGA (static geodata and lookup tables) is sent to every worker once at startup, tasks only carry individuals
+        #with shared=True the geodata is written once into shared memory and workers only receive a handle to it
+        self.workers = workers
+        self.shared = SharedGeodata(upga.context, {"service_distances": upga.service_distances}) if shared else None
+        if self.shared is not None:
+            initargs = (upga.without_geodata(), self.shared.handle)
+        else:
+            initargs = (upga,)
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs)
+
+    def map(self, individuals):
+        chunksize = max(1, len(individuals) // (4 * self.workers))
+        return list(self.executor.map(_evaluate_in_worker, individuals, chunksize=chunksize))
+
+    def close(self):
+        self.executor.shutdown()
+        if self.shared is not None:
+            self.shared.close()
+
+
+def make_evaluator(upga, backend="process", workers=1, shared_geodata=True):
+    if workers is None or workers <= 1 or backend == "serial":
+        return SerialEvaluator(upga)
+    if backend == "thread":
+        return ThreadPoolEvaluator(upga, workers)
+    if backend == "process":
+        return ProcessPoolEvaluator(upga, workers, shared_geodata)
+    raise ValueError(f"Unsupported evaluator backend: {backend}")
@@ -0,0 +1,263 @@
+##### ExactSolver.py ###
+#this class is used by UPGA.solve_exact to score every genome of a small instance
+#every fitness term only depends on the site and floor count of each building, so the terms are tabulated once per
+#(building, site, floors) and whole chunks of genomes (site permutation x floor vector) are scored with numpy indexing
+#sums are accumulated in the same order as the UPGA fitness functions, so the scores equal UPGA.evaluate bit for bit
+
+import itertools
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from shapely import STRtree
+
+from UPGA.UPGAClasses.ShadowTable import UNOCCUPIED_HEIGHT
+
+
+def search_space_size(n_sites, n_buildings, n_floors):
+    #injective site assignments times floor vectors
+    if n_buildings > n_sites:
+        return 0
+    return math.perm(n_sites, n_buildings) * n_floors ** n_buildings
+
+
+def round_like_python(values, digits):
+    #np.round is not correctly rounded, the few distinct values are rounded with the builtin round instead
+    unique, inverse = np.unique(values, return_inverse=True)
+    return np.array([round(float(value), digits) for value in unique])[inverse.reshape(values.shape)]
+
+
+class ExactSolver:
+    def __init__(self, upga, max_floors):
+        self.floors = list(range(1, max_floors + 1))
+        self.site_names = list(upga.context.site_names)
+        self.building_names = list(upga.building_specs)
+        self.shadow_table = upga.shadow_table
+        n_floors = len(self.floors)
+        heights = [floors * upga.floor_height for floors in self.floors]
+        self.heights = np.array(heights)
+
+        #GFA score per (building, site, floors)
+        self.gfa = np.array([[[upga.gfa_score(name, site, height) for height in heights] for site in self.site_names]
+                             for name in self.building_names])
+
+        #walkability/cycleability (score sum, pair count) per site, only buildings of the accessibility type count
+        access_table = upga.access_analyzer.access_table
+        self.access_buildings = [b for b, name in enumerate(self.building_names)
+                                 if upga.building_specs[name]["type"] == upga.accessability_building_type]
+        self.access = {mode: (np.array([access_table[mode][site][0] for site in self.site_names], dtype=float),
+                              np.array([access_table[mode][site][1] for site in self.site_names]))
+                       for mode in ["walk", "cycle"]}
+
+        #mean site-to-service distances, and the buildings of every service category
+        self.service_distances = upga.service_distances[[upga.site_index[site] for site in self.site_names]]
+        self.service_members = [[b for b, name in enumerate(self.building_names) if upga.building_specs[name]["type"] == building_type]
+                                for building_type in upga.service_categories]
+        self.D_max = upga.D_max
+
+        #new shadows per (site, floors), flattened to the index site * n_floors + floor
+        #(nature_shadow="sites" adds the unoccupied default shadow as last floor index of every site)
+        layer = upga.context.existing
+        self.nature_shadow = upga.nature_shadow
+        shadow_heights = heights + [UNOCCUPIED_HEIGHT] if self.nature_shadow == "sites" else heights
+        entries = [upga.shadow_table.get(site, height) for site in self.site_names for height in shadow_heights]
+        self.nature_overlap = np.array([entry["nature_overlap"] for entry in entries])
+        self.polygon_overlap = np.array([entry["nature_polygon_overlap"] for entry in entries])
+        self.reaches = np.array([[t in entry["sites_reached"] for t in range(len(self.site_names))] for entry in entries], dtype=bool)
+        shadows = [entry["geometry"] for entry in entries]
+        first, second = STRtree(shadows).query(shadows, predicate="intersects")
+        self.shadow_touch = np.zeros((len(shadows), len(shadows)), dtype=bool)
+        self.shadow_touch[first, second] = True
+        self.merged_overlaps = {}
+        self.S_n = upga.S_n
+        self.total_nature_area = upga.context.total_nature_area
+
+        #conflicts with existing buildings per (site, floors), and the existing buildings each one hits
+        contributions = [upga.shadow_building_contribution(site, height) for site in self.site_names for height in heights]
+        self.existing_conflict = np.array([contribution["area_existing"] for contribution in contributions])
+        self.new_conflict = np.array([contribution["area_new"] for contribution in contributions])
+        ids = list(dict.fromkeys(exist_id for contribution in contributions for exist_id in contribution["affected_ids"]))
+        id_column = {exist_id: column for column, exist_id in enumerate(ids)}
+        self.affected = np.zeros((len(contributions), len(ids)), dtype=bool)
+        for sf, contribution in enumerate(contributions):
+            self.affected[sf, [id_column[exist_id] for exist_id in contribution["affected_ids"]]] = True
+        self.site_area = np.array([contribution["roof_area"] for contribution in contributions[::n_floors]])
+        self.roof_area = layer["roof_area"]
+        self.total_existing = len(layer["height"])
+        self.S_a = upga.S_a
+        self.S_h = upga.S_h
+        self.W_a = upga.W_a
+        self.W_h = upga.W_h
+        self.fitness_weights = dict(upga.fitness_weights)
+
+    def genomes(self, perms, floor_vectors):
+        #every combination of the given site permutations and floor vectors, permutation-major
+        sites = np.repeat(perms, len(floor_vectors), axis=0)
+        floors = np.tile(floor_vectors, (len(perms), 1))
+        return sites, floors
+
+    def score(self, sites, floors):
+        """Total fitness of every genome, rows of sites/floors hold the site and floor index of each building."""
+        n_buildings = len(self.building_names)
+        n = len(sites)
+        sf = sites * len(self.floors) + floors
+
+        #GFA
+        total_score = np.zeros(n)
+        for b in range(n_buildings):
+            total_score = total_score + self.gfa[b, sites[:, b], floors[:, b]]
+        gfa_fitness = round_like_python(total_score / n_buildings, 2)
+
+        #shadow on nature, genomes with overlapping shadows are merged exactly by the shadow table
+        if self.nature_shadow == "sites":
+            penalty_area = self.site_nature_overlap(sites, floors)
+        else:
+            penalty_area = np.zeros(n)
+            for b in range(n_buildings):
+                penalty_area = penalty_area + self.nature_overlap[sf[:, b]]
+            touching = np.zeros(n, dtype=bool)
+            for b1, b2 in itertools.combinations(range(n_buildings), 2):
+                touching |= self.shadow_touch[sf[:, b1], sf[:, b2]]
+            for row in np.flatnonzero(touching):
+                penalty_area[row] = self.merged_nature_overlap(tuple(sf[row].tolist()))
+        shadow_nature_fitness = np.maximum(np.minimum(1 - ((penalty_area * self.S_n) / self.total_nature_area), 1.0), 0.0)
+
+        #walkability and cycleability
+        walk_fitness, cycle_fitness = [self.access_score(sites, *self.access[mode]) for mode in ["walk", "cycle"]]
+
+        #service availability, averaged over the service categories
+        service_fitness = np.zeros(n)
+        for col, members in enumerate(self.service_members):
+            if not members or np.isnan(self.service_distances[:, col]).any():
+                continue
+            avg_dist = self.service_distances[sites[:, members], col].mean(axis=1)
+            service_score = np.minimum(1.0, 1 - avg_dist / self.D_max)
+            service_fitness = service_fitness + round_like_python(np.maximum(0.0, service_score), 3)
+        if self.service_members:
+            service_fitness = service_fitness / len(self.service_members)
+
+        #shadows between new and existing buildings
+        conflict_existing = np.zeros(n)
+        conflict_new = np.zeros(n)
+        new_roof_area = np.zeros(n)
+        affected = np.zeros((n, self.affected.shape[1]), dtype=bool)
+        for b in range(n_buildings):
+            conflict_existing = conflict_existing + self.existing_conflict[sf[:, b]]
+            conflict_new = conflict_new + self.new_conflict[sf[:, b]]
+            new_roof_area = new_roof_area + self.site_area[sites[:, b]]
+            affected |= self.affected[sf[:, b]]
+        total_roof_area = self.roof_area + new_roof_area
+        penalty_ratio = np.where(total_roof_area > 0, (conflict_existing + conflict_new) / total_roof_area, 1.0)
+        area_penalty = np.minimum(penalty_ratio * self.S_a, 1.0)
+        if self.total_existing > 0:
+            hit_penalty = np.minimum((affected.sum(axis=1) * self.S_h) / self.total_existing, 1.0)
+        else:
+            hit_penalty = np.ones(n)
+        building_fitness = np.maximum(0.0, np.minimum(1.0, 1.0 - (self.W_a * area_penalty + self.W_h * hit_penalty)))
+        shadow_building_fitness = round_like_python(building_fitness, 3)
+
+        #same weights and order as UPGA.weighted_total
+        terms = {
+            "GFA": gfa_fitness,
+            "Shadow Nature": shadow_nature_fitness,
+            "Walkability": walk_fitness,
+            "Cycleability": cycle_fitness,
+            "Serviceability": service_fitness,
+            "Shadow Buildings": shadow_building_fitness
+        }
+        total = np.zeros(n)
+        for name, weight in self.fitness_weights.items():
+            total = total + weight * terms[name]
+        return total
+
+    def access_score(self, sites, site_totals, site_counts):
+        total_score = np.zeros(len(sites))
+        count = np.zeros(len(sites), dtype=int)
+        for b in self.access_buildings:
+            total_score = total_score + site_totals[sites[:, b]]
+            count = count + site_counts[sites[:, b]]
+        return np.where(count > 0, round_like_python(total_score / np.maximum(count, 1), 3), 0.0)
+
+    def site_nature_overlap(self, sites, floors):
+        #ShadowTable.site_nature_overlap_area of every genome: per site, the shadows reaching its buffer summed over the nature polygons
+        n = len(sites)
+        n_sites = len(self.site_names)
+        n_heights = len(self.floors) + 1
+        #shadow entry of every site, unoccupied sites keep the default shadow (last height index)
+        site_heights = np.full((n, n_sites), n_heights - 1)
+        rows = np.arange(n)
+        for b in range(sites.shape[1]):
+            site_heights[rows, sites[:, b]] = floors[:, b]
+        entry = np.arange(n_sites) * n_heights + site_heights
+        reaches = self.reaches[entry]
+
+        penalty_area = np.zeros(n)
+        for t in range(n_sites):
+            area = np.zeros(n)
+            for s in range(n_sites):
+                area = area + np.where(reaches[:, s, t], self.polygon_overlap[entry[:, s]], 0.0)
+            penalty_area = penalty_area + area
+
+        #genomes where overlapping shadows reach the same site are merged by the shadow table
+        merged = np.zeros(n, dtype=bool)
+        for s1, s2 in itertools.combinations(range(n_sites), 2):
+            merged |= (reaches[:, s1, :] & reaches[:, s2, :]).any(axis=1) & self.shadow_touch[entry[:, s1], entry[:, s2]]
+        for row in np.flatnonzero(merged):
+            penalty_area[row] = self.merged_site_overlap(tuple(site_heights[row].tolist()))
+        return penalty_area
+
+    def merged_site_overlap(self, site_heights):
+        #memoized per height index of every site
+        area = self.merged_overlaps.get(site_heights)
+        if area is None:
+            area = self.shadow_table.site_nature_overlap_area(
+                [None if h == len(self.floors) else self.heights[h] for h in site_heights])
+            self.merged_overlaps[site_heights] = area
+        return area
+
+    def merged_nature_overlap(self, sf_key):
+        #nature overlap of a genome whose shadows overlap each other, memoized per ordered (site, floors) combination
+        area = self.merged_overlaps.get(sf_key)
+        if area is None:
+            n_floors = len(self.floors)
+            entries = [self.shadow_table.get(self.site_names[sf // n_floors], self.heights[sf % n_floors]) for sf in sf_key]
+            area = self.shadow_table.nature_overlap_area(entries)
+            self.merged_overlaps[sf_key] = area
+        return area
+
+    def best_of_chunk(self, perms, floor_vectors, top_n):
+        #the top_n genomes of a chunk as (total fitness, site indices, floor indices), ties keep enumeration order
+        sites, floors = self.genomes(perms, floor_vectors)
+        totals = self.score(sites, floors)
+        best = np.argsort(-totals, kind="stable")[:top_n]
+        return [(float(totals[i]), tuple(sites[i].tolist()), tuple(floors[i].tolist())) for i in best]
+
+    def solve(self, top_n=5, workers=1, chunk_size=100000):
+        """Scores every genome and returns the top_n as (total fitness, site indices, floor indices), best first."""
+        n_buildings = len(self.building_names)
+        perms = np.array(list(itertools.permutations(range(len(self.site_names)), n_buildings)), dtype=int).reshape(-1, n_buildings)
+        floor_vectors = np.array(list(itertools.product(range(len(self.floors)), repeat=n_buildings)), dtype=int).reshape(-1, n_buildings)
+        perms_per_chunk = max(1, chunk_size // len(floor_vectors))
+        chunks = [perms[i:i + perms_per_chunk] for i in range(0, len(perms), perms_per_chunk)]
+
+        if workers is not None and workers > 1 and len(chunks) > 1:
+            #the tables are sent to every worker once at startup, tasks only carry site permutations
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+                results = list(executor.map(_best_of_chunk_in_worker, chunks, [floor_vectors] * len(chunks), [top_n] * len(chunks)))
+        else:
+            results = [self.best_of_chunk(chunk, floor_vectors, top_n) for chunk in chunks]
+
+        #chunks are merged in enumeration order, so ties keep the first genome
+        candidates = [candidate for result in results for candidate in result]
+        return sorted(candidates, key=lambda candidate: -candidate[0])[:top_n]
+
+
+#solver of a worker process, set once by the pool initializer
+_worker_solver = None
+
+def _init_worker(solver):
+    global _worker_solver
+    _worker_solver = solver
+
+def _best_of_chunk_in_worker(perms, floor_vectors, top_n):
+    return _worker_solver.best_of_chunk(perms, floor_vectors, top_n)
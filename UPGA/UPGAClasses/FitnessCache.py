@@ -0,0 +1,59 @@
+##### FitnessCache.py ###
+#this class is used in the UPGA to memoize fitness breakdowns of already evaluated genomes
+#the GA breeds every child from the same top-2 parents, so most children are exact duplicates
+
+from collections import OrderedDict
+
+class FitnessCache:
+    def __init__(self, maxsize=4096):
+        #maxsize=None keeps every entry, maxsize=0 disables caching
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        #returns the cached breakdown (or None) and marks the entry as recently used
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def peek(self, key):
+        #returns the cached breakdown (or None) without counting a lookup or changing the eviction order
+        return self.entries.get(key)
+
+    def put(self, key, value):
+        if self.maxsize == 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        #least recently used entries are evicted first
+        while self.maxsize is not None and len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "hit_rate": self.hits / lookups if lookups > 0 else 0.0
+        }
@@ -0,0 +1,73 @@
+##### Genome.py ###
+#this module holds the compact UPGA individual and its conversion to the dict format of the UPGA API
+#a Genome is the site index and floor count of every building (in building_specs order), stored in immutable int tuples,
+#so the genetic operators build children without copying and genomes hash and compare directly (fitness cache keys)
+#building names, types, target GFAs and site names are kept once in the shared GenomeCodec
+
+
+class Genome:
+    __slots__ = ("sites", "floors", "_hash")
+
+    def __init__(self, sites, floors):
+        self.sites = tuple(sites)
+        self.floors = tuple(floors)
+        self._hash = hash((self.sites, self.floors))
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return isinstance(other, Genome) and self._hash == other._hash and self.sites == other.sites and self.floors == other.floors
+
+    def __repr__(self):
+        return f"Genome(sites={self.sites}, floors={self.floors})"
+
+    def __getstate__(self):
+        #string hashes differ between processes, so the hash is recomputed after unpickling
+        return self.sites, self.floors
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def with_floors(self, building, floors):
+        #copy with one building's floor count replaced
+        new_floors = list(self.floors)
+        new_floors[building] = floors
+        return Genome(self.sites, new_floors)
+
+    def with_swapped_sites(self, building1, building2):
+        #copy with the sites of two buildings exchanged
+        new_sites = list(self.sites)
+        new_sites[building1], new_sites[building2] = new_sites[building2], new_sites[building1]
+        return Genome(new_sites, self.floors)
+
+
+class GenomeCodec:
+    def __init__(self, building_specs, site_names, site_areas, footprint_ratio, floor_height):
+        self.names = list(building_specs)
+        self.types = [building_specs[name]["type"] for name in self.names]
+        self.target_gfas = [building_specs[name]["target_gfa"] for name in self.names]
+        self.site_names = list(site_names)
+        self.site_index = {name: i for i, name in enumerate(self.site_names)}
+        self.site_areas = [site_areas[name] for name in self.site_names]
+        self.footprint_ratio = footprint_ratio
+        self.floor_height = floor_height
+
+    def encode(self, individual):
+        """Genome of a dict individual, floor counts are rounded like the former cache keys, so non-integer heights are kept."""
+        return Genome(
+            [self.site_index[individual[name]["site"]] for name in self.names],
+            [round(individual[name]["height"] / self.floor_height, 3) for name in self.names]
+        )
+
+    def decode(self, genome):
+        """Dict individual of a genome: {building name: {"site", "type", "height", "gfa"}}."""
+        individual = {}
+        for name, building_type, site, floors in zip(self.names, self.types, genome.sites, genome.floors):
+            individual[name] = {
+                "site": self.site_names[site],
+                "type": building_type,
+                "height": floors * self.floor_height,
+                "gfa": round(self.site_areas[site] * self.footprint_ratio * floors)
+            }
+        return individual
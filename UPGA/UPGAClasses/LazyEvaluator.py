@@ -0,0 +1,116 @@
+##### LazyEvaluator.py ###
+#this class is used in the UPGA to skip the exact evaluation of children that can no longer be selected
+#every fitness term is in [0, 1], so the terms computed so far plus 1.0 for every remaining term bound the total fitness
+#terms are computed from cheap to expensive, a child stops as soon as its bound falls below the threshold: the total of the
+#worst individual that can still be selected (see Selection.survivors), skipped terms are recorded as bounds, not values
+
+import heapq
+from collections import Counter
+
+#table lookups (GFA, accessibility and service tables), then the shadow table union, then the shadow STRtree queries
+CHEAP_TERMS = ["GFA", "Walkability", "Cycleability", "Serviceability"]
+SHADOW_TERMS = ["Shadow Nature", "Shadow Buildings"]
+
+
+class LazyEvaluator:
+    def __init__(self, upga):
+        self.upga = upga
+        self.evaluations = 0
+        self.bounded = 0
+        self.skipped_terms = Counter()
+
+    def cheap_terms(self, individual):
+        upga = self.upga
+        service_scores = {building_type: upga.compute_serviceavailability_fitness(individual, building_type)
+                          for building_type in upga.service_categories}
+        return {
+            "GFA": upga.compute_fitness_gfa(individual),
+            "Walkability": upga.compute_walkability_fitness(individual),
+            "Cycleability": upga.compute_cycleability_fitness(individual),
+            "Serviceability": sum(service_scores.values()) / len(service_scores) if service_scores else 0.0,
+            "service_scores": service_scores
+        }
+
+    def upper_bound(self, terms):
+        #same summation as the exact total with 1.0 for unknown terms, rounding is monotonic so the bound is never below it
+        return self.upga.weighted_total({name: terms.get(name, 1.0) for name in self.upga.fitness_weights})
+
+    def bounded_breakdown(self, terms, bound):
+        skipped = [name for name in self.upga.fitness_weights if name not in terms]
+        self.bounded += 1
+        self.skipped_terms.update(skipped)
+        breakdown = {name: value for name, value in terms.items() if name in self.upga.fitness_weights}
+        breakdown.update({"total_fitness": bound, "bound": True, "upper_bounds": {name: 1.0 for name in skipped},
+                          "service_scores": terms["service_scores"]})
+        if "area_nature_conflict" in terms:
+            breakdown["area_nature_conflict"] = terms["area_nature_conflict"]
+        return breakdown
+
+    def evaluate(self, pending, population, known, survivors):
+        """
+        Breakdowns of the pending genomes ({genome: parents}) of population, known holds the exact breakdowns of the other genomes.
+        The survivors best individuals of the population get exact breakdowns, the others may get bounded ones.
+        """
+        upga = self.upga
+        counts = Counter(population)
+        #min-heap of the survivors best exact totals (duplicates count once per copy), its root is the threshold
+        best = []
+        for key, breakdown in known.items():
+            self.push(best, breakdown["total_fitness"], counts[key], survivors)
+
+        #partial terms of genomes bounded in an earlier generation are taken from their cached record
+        individuals = {}
+        partials = {}
+        for key in pending:
+            individuals[key] = upga.codec.decode(key)
+            cached = upga.fitness_cache.peek(key)
+            if cached is not None and cached.get("bound"):
+                partials[key] = {name: value for name, value in cached.items() if name in upga.fitness_weights or name in ["service_scores", "area_nature_conflict"]}
+            else:
+                partials[key] = self.cheap_terms(individuals[key])
+
+        #the most promising children are evaluated first, so the threshold rises early
+        results = {}
+        for key in sorted(pending, key=lambda key: -self.upper_bound(partials[key])):
+            terms = partials[key]
+            bound = self.upper_bound(terms)
+            if bound >= self.threshold(best, survivors) and "Shadow Nature" not in terms:
+                terms["Shadow Nature"], terms["area_nature_conflict"] = upga.compute_shadow_nature_fitness(individuals[key])
+                bound = self.upper_bound(terms)
+            if bound < self.threshold(best, survivors):
+                results[key] = self.bounded_breakdown(terms, bound)
+                upga.fitness_cache.put(key, results[key])
+                continue
+
+            #the terms computed above are reused by the exact evaluation, delta or full
+            reused = {"Walkability": terms["Walkability"], "Cycleability": terms["Cycleability"],
+                      "service_scores": terms["service_scores"],
+                      "shadow_nature": (terms["Shadow Nature"], terms["area_nature_conflict"])}
+            breakdown = upga.delta_evaluate(key, pending[key], reused)
+            if breakdown is None:
+                breakdown = upga.compute_fitness_breakdown(individuals[key], reused=reused)
+                upga.fitness_cache.put(key, breakdown)
+            self.evaluations += 1
+            self.push(best, breakdown["total_fitness"], counts[key], survivors)
+            results[key] = breakdown
+        return results
+
+    def push(self, best, total, count, survivors):
+        for _ in range(count):
+            if len(best) < survivors:
+                heapq.heappush(best, total)
+            elif total > best[0]:
+                heapq.heapreplace(best, total)
+
+    def threshold(self, best, survivors):
+        #a bound below the survivors-th best exact total cannot reach a selectable rank
+        return best[0] if len(best) >= survivors else float("-inf")
+
+    def stats(self):
+        children = self.evaluations + self.bounded
+        return {
+            "evaluations": self.evaluations,
+            "bounded": self.bounded,
+            "skipped_terms": dict(self.skipped_terms),
+            "bounded_rate": self.bounded / children if children > 0 else 0.0
+        }
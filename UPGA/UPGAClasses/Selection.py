@@ -0,0 +1,106 @@
+##### Selection.py ###
+#this module holds the parent selection strategies of the UPGA
+#the population is ranked once per generation (rank), afterwards every parent draw (draw) costs O(1)
+#("top" always returns the two best individuals, which is the original UPGA behaviour)
+
+
+def rank_population(fitnesses):
+    #population indices from best to worst, ties keep population order
+    return sorted(range(len(fitnesses)), key=lambda i: fitnesses[i], reverse=True)
+
+
+class TopSelection:
+    #the k best individuals for every child (elitism selection)
+    def rank(self, fitnesses):
+        self.ranked = rank_population(fitnesses)
+        return self.ranked
+
+    def draw(self, rng, k=2):
+        return self.ranked[:k]
+
+    def survivors(self, n, k=2):
+        #number of best ranks draw can return, individuals ranked below them are never selected
+        return min(n, k)
+
+
+class TournamentSelection(TopSelection):
+    def __init__(self, size=3):
+        self.size = size
+
+    def draw(self, rng, k=2):
+        #each parent is the best of size uniformly drawn individuals, compared by rank
+        n = len(self.ranked)
+        return [self.ranked[min(rng.randrange(n) for _ in range(self.size))] for _ in range(k)]
+
+    def survivors(self, n, k=2):
+        return n
+
+
+class RankRouletteSelection(TopSelection):
+    #linear ranking: the best of n individuals is drawn with weight n, the worst with weight 1
+    def __init__(self):
+        self.tables = {}
+
+    def rank(self, fitnesses):
+        self.ranked = rank_population(fitnesses)
+        n = len(self.ranked)
+        if n not in self.tables:
+            #the rank weights only depend on n, so the alias table is built once per population size
+            self.tables[n] = self.alias_table([n - r for r in range(n)])
+        self.prob, self.alias = self.tables[n]
+        return self.ranked
+
+    def alias_table(self, weights):
+        #Vose's alias method: one uniform index and one coin flip per draw
+        n = len(weights)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        return prob, alias
+
+    def draw(self, rng, k=2):
+        parents = []
+        for _ in range(k):
+            r = rng.randrange(len(self.ranked))
+            parents.append(self.ranked[r if rng.random() < self.prob[r] else self.alias[r]])
+        return parents
+
+    def survivors(self, n, k=2):
+        return n
+
+
+class TruncationSelection(TopSelection):
+    def __init__(self, ratio=0.5):
+        self.ratio = ratio
+
+    def draw(self, rng, k=2):
+        #parents are drawn uniformly from the best ratio of the population
+        n = max(1, int(len(self.ranked) * self.ratio))
+        return [self.ranked[rng.randrange(n)] for _ in range(k)]
+
+    def survivors(self, n, k=2):
+        return min(n, max(1, int(n * self.ratio)))
+
+
+SELECTIONS = {
+    "top": TopSelection,
+    "tournament": TournamentSelection,
+    "rank_roulette": RankRouletteSelection,
+    "truncation": TruncationSelection
+}
+
+
+def make_selection(selection="top", options=None):
+    if selection not in SELECTIONS:
+        raise ValueError(f"Unsupported selection: {selection}")
+    return SELECTIONS[selection](**(options or {}))
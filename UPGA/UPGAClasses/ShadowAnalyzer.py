@@ -5,6 +5,7 @@ import geopandas as gpd
 import matplotlib.pyplot as plt
 from shapely.geometry import Polygon
 import numpy as np
+import shapely
 from shapely.ops import unary_union
 
 class ShadowAnalyzer:
@@ -15,37 +16,12 @@ class ShadowAnalyzer:
         self.shadow_gdf = None
 
     def calculate_shadows(self, azimuth_deg, altitude_deg):
-        azimuth_rad = np.radians(azimuth_deg)
-        altitude_rad = np.radians(altitude_deg)
-        shadow_length_factor = 1 / np.tan(altitude_rad)  
-
-        shadows = []
-        for _, row in self.sites_gdf.iterrows():
-            geom = row.geometry
-            height = row.height
-
-            #using Equation (3) in thesis
-            #shadow projection offsets 
-            dx = -height * shadow_length_factor * np.sin(azimuth_rad)
-            dy = -height * shadow_length_factor * np.cos(azimuth_rad)
-
-            coords = list(geom.exterior.coords)
-            shadow_coords = [(x + dx, y + dy) for x, y in coords]
-
-            #create polygons for each side of the building connecting to its shadow
-            for i in range(len(coords) - 1):
-                corner = Polygon([
-                    coords[i],
-                    coords[i + 1],
-                    shadow_coords[i + 1],
-                    shadow_coords[i]
-                ])
-                shadows.append(corner)
-            #polygon representing the full shadow projection of the building footprint
-            shadows.append(Polygon(shadow_coords))
-
-        #store all shadow polygons in a GeoDataFrame (same CRS)
-        self.shadow_gdf = gpd.GeoDataFrame(geometry=shadows, crs=self.crs)
+        #one shadow polygon per building, computed for all buildings at once (see calculate_shadow_geometries)
+        shadows = calculate_shadow_geometries(
+            self.sites_gdf.geometry.values, self.sites_gdf['height'].to_numpy(dtype=float), azimuth_deg, altitude_deg
+        )
+        #store the shadow polygons in a GeoDataFrame (same CRS), tagged with the name of the casting building
+        self.shadow_gdf = gpd.GeoDataFrame({'name': self.sites_gdf['name'].to_numpy()}, geometry=shadows, crs=self.crs)
 
     def plot(self, azimuth_deg, altitude_deg):
         if self.shadow_gdf is None:
@@ -83,6 +59,78 @@ class ShadowAnalyzer:
         return gpd.GeoDataFrame(site_shadow_data, geometry="shadow_geometry", crs=self.crs)
 
 
+def calculate_shadow_geometries(footprints, heights, azimuth_deg, altitude_deg):
+    """
+    Vectorized shadow kernel: returns an array with one shadow polygon per footprint.
+    The shadow is the footprint swept along the shadow offset, i.e. the union of the side quads
+    connecting every footprint edge to its shifted copy and the shifted footprint itself.
+    Convex footprints use the convex hull of the footprint and its shifted copy,
+    concave ones fall back to the exact union of the quads. MultiPolygons are handled per part.
+    """
+    footprints = np.asarray(footprints, dtype=object)
+    heights = np.asarray(heights, dtype=float)
+    azimuth_rad = np.radians(azimuth_deg)
+    altitude_rad = np.radians(altitude_deg)
+    shadow_length_factor = 1 / np.tan(altitude_rad)
+
+    #using Equation (3) in thesis
+    #shadow projection offsets per building
+    offsets = np.column_stack([
+        -heights * shadow_length_factor * np.sin(azimuth_rad),
+        -heights * shadow_length_factor * np.cos(azimuth_rad)
+    ])
+
+    shadows = np.array([Polygon() for _ in range(len(footprints))], dtype=object)
+    parts, part_building = shapely.get_parts(footprints, return_index=True)
+    if len(parts) == 0:
+        return shadows
+
+    #exterior coordinates of every part and their shifted copies
+    rings = shapely.get_exterior_ring(parts)
+    coords, coord_part = shapely.get_coordinates(rings, return_index=True)
+    shadow_coords = coords + offsets[part_building][coord_part]
+
+    #convex parts: hull of the footprint and its shifted copy
+    point_part = np.concatenate([coord_part, coord_part])
+    order = np.argsort(point_part, kind="stable")
+    points = shapely.points(np.vstack([coords, shadow_coords])[order])
+    part_shadows = shapely.convex_hull(shapely.multipoints(points, indices=point_part[order]))
+
+    #concave parts: exact union of the footprint, its shifted copy and the side quads of the edges
+    #facing the shadow direction (the other edges are swept inside these three anyway)
+    exterior_polygons = shapely.polygons(rings)
+    concave = ~np.isclose(shapely.area(shapely.convex_hull(rings)), shapely.area(exterior_polygons), rtol=1e-9, atol=1e-9)
+    if concave.any():
+        edge_start = np.flatnonzero(coord_part[:-1] == coord_part[1:])
+        edge_vectors = coords[edge_start + 1] - coords[edge_start]
+        edge_offsets = shadow_coords[edge_start] - coords[edge_start]
+        #outward normal of a counter-clockwise ring edge (dx, dy) is (dy, -dx)
+        orientation = np.where(shapely.is_ccw(rings), 1.0, -1.0)[coord_part[edge_start]]
+        facing = orientation * (edge_vectors[:, 1] * edge_offsets[:, 0] - edge_vectors[:, 0] * edge_offsets[:, 1]) > 0
+        edge_start = edge_start[facing & concave[coord_part[edge_start]]]
+        quads = shapely.polygons(np.stack([
+            coords[edge_start], coords[edge_start + 1],
+            shadow_coords[edge_start + 1], shadow_coords[edge_start], coords[edge_start]
+        ], axis=1))
+        quad_part = coord_part[edge_start]
+        shifted_parts = shapely.polygons(shapely.linearrings(shadow_coords, indices=coord_part))
+        concave_parts = np.flatnonzero(concave)
+        quad_start = np.searchsorted(quad_part, concave_parts, side="left")
+        quad_end = np.searchsorted(quad_part, concave_parts, side="right")
+        for part, start, end in zip(concave_parts, quad_start, quad_end):
+            part_shadows[part] = shapely.union_all(
+                np.concatenate([quads[start:end], [exterior_polygons[part], shifted_parts[part]]])
+            )
+
+    #merge the parts of multipart footprints
+    counts = np.bincount(part_building, minlength=len(footprints))
+    single = counts[part_building] == 1
+    shadows[part_building[single]] = part_shadows[single]
+    for building in np.flatnonzero(counts > 1):
+        shadows[building] = shapely.union_all(part_shadows[part_building == building])
+    return shadows
+
+
 #Eksample for or plotting 
 def plot_shadow_from_gdf(gdf, height_dict=None, azimuth_deg=180, altitude_deg=30, crs="EPSG:32632"):
     if height_dict is None:
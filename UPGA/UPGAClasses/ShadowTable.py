@@ -0,0 +1,124 @@
+##### ShadowTable.py ###
+#this class is used in the UPGA shadow fitness functions and plotting
+#a new building's shadow only depends on its site polygon and floor count, so each (site, floors)
+#shadow and its overlaps with nature and existing buildings are computed once and looked up afterwards
+
+import itertools
+
+from shapely.ops import unary_union
+from shapely.prepared import prep
+
+from UPGA.UPGAClasses.ShadowAnalyzer import calculate_shadow_geometries
+
+#ShadowAnalyzer height of sites without a building, and the radius in which a site collects shadows (get_shadow_data)
+UNOCCUPIED_HEIGHT = 15.0
+SITE_BUFFER = 200
+
+class ShadowTable:
+    def __init__(self, context, floor_height):
+        #context: the run's EvaluationContext (sites, nature union and existing layer)
+        self.context = context
+        self.crs = context.crs
+        self.azimuth = context.azimuth
+        self.altitude = context.altitude
+        self.floor_height = floor_height
+        self.total_nature_area = context.total_nature_area
+        self.site_buffers = [site_geom.buffer(SITE_BUFFER) for site_geom in context.site_geoms]
+
+        self.entries = {}
+
+    def __getstate__(self):
+        #prepared geometries cannot be pickled, worker processes rebuild their entries on first use
+        state = self.__dict__.copy()
+        state["entries"] = {}
+        return state
+
+    def __len__(self):
+        return len(self.entries)
+
+    def floors(self, height):
+        return round(height / self.floor_height, 3)
+
+    def get(self, site_name, height):
+        """Returns the table entry for a building of the given height on site_name, computing it on first use."""
+        key = (site_name, self.floors(height))
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.compute_entry(site_name, height)
+            self.entries[key] = entry
+        return entry
+
+    def compute_entry(self, site_name, height):
+        site_geom = self.context.site_geom(site_name)
+        shadow_geom = calculate_shadow_geometries([site_geom], [height], self.azimuth, self.altitude)[0]
+        prepared = prep(shadow_geom)
+
+        nature_overlap = shadow_geom.intersection(self.context.nature_union).area if self.context.nature_prepared.intersects(shadow_geom) else 0.0
+        nature_polygon_overlap = self.nature_polygon_overlap(shadow_geom)
+
+        #sites whose 200 m buffer the shadow reaches
+        sites_reached = frozenset(t for t, site_buffer in enumerate(self.site_buffers) if prepared.intersects(site_buffer))
+
+        #(position in the existing layer, overlap area) for every existing building the shadow touches
+        existing_overlaps = []
+        for exist_pos in sorted(self.context.existing["footprint_tree"].query(shadow_geom, predicate="intersects")):
+            overlap_area = shadow_geom.intersection(self.context.existing["footprint"][exist_pos]).area
+            if overlap_area > 0:
+                existing_overlaps.append((int(exist_pos), overlap_area))
+
+        return {
+            "geometry": shadow_geom,
+            "prepared": prepared,
+            "nature_overlap": nature_overlap,
+            "nature_polygon_overlap": nature_polygon_overlap,
+            "sites_reached": sites_reached,
+            "existing_overlaps": existing_overlaps
+        }
+
+    def nature_polygon_overlap(self, shadow_geom):
+        #overlap summed over the nature polygons one by one (as the gpd.overlay of the original fitness function)
+        area = 0.0
+        for nature_pos in sorted(self.context.nature_tree.query(shadow_geom, predicate="intersects")):
+            area += shadow_geom.intersection(self.context.nature_polygons[nature_pos]).area
+        return area
+
+    def site_nature_overlap_area(self, site_heights):
+        """
+        Nature penalty area as computed by ShadowAnalyzer.get_shadow_data: every site casts a shadow (unoccupied sites at the
+        15 m default), each site merges the shadows reaching its 200 m buffer and the merged shadow of every site is intersected
+        with every nature polygon. site_heights holds the building height per site (context order, None if unoccupied).
+        """
+        entries = [self.get(site_name, UNOCCUPIED_HEIGHT if height is None else height)
+                   for site_name, height in zip(self.context.site_names, site_heights)]
+        total_area = 0.0
+        merged = {}
+        for t in range(len(entries)):
+            reaching = tuple(s for s, entry in enumerate(entries) if t in entry["sites_reached"])
+            if reaching not in merged:
+                merged[reaching] = self.merged_polygon_overlap([entries[s] for s in reaching])
+            total_area += merged[reaching]
+        return total_area
+
+    def merged_polygon_overlap(self, entries):
+        #shadows of one site buffer, only merged when some of them overlap
+        if any(first["prepared"].intersects(second["geometry"]) for first, second in itertools.combinations(entries, 2)):
+            return self.nature_polygon_overlap(unary_union([entry["geometry"] for entry in entries]))
+        area = 0.0
+        for entry in entries:
+            area += entry["nature_polygon_overlap"]
+        return area
+
+    def nature_overlap_area(self, entries):
+        #nature area covered by the union of the given shadows (nature_shadow="union")
+        #shadows that do not touch any other shadow contribute their tabulated overlap,
+        #only the overlapping ones are merged before intersecting with nature
+        total_area = 0.0
+        overlapping = []
+        for i, entry in enumerate(entries):
+            if any(entry["prepared"].intersects(other["geometry"]) for j, other in enumerate(entries) if j != i):
+                overlapping.append(entry["geometry"])
+            else:
+                total_area += entry["nature_overlap"]
+        if overlapping:
+            total_area += unary_union(overlapping).intersection(self.context.nature_union).area
+        return total_area
@@ -0,0 +1,110 @@
+##### SharedGeodata.py ###
+#this class is used by the UPGA process-pool evaluator to hand the static evaluation data to its workers
+#the EvaluationContext (as WKB geometry buffers and coordinate arrays) and the precomputed tables are written once into
+#one shared memory block, workers attach to it read-only and rebuild their geometries and STRtrees locally,
+#so only a small handle is pickled per worker instead of the GeoDataFrames
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import shapely
+
+from UPGA.UPGAClasses.EvaluationContext import EvaluationContext
+
+
+def wkb_arrays(geoms):
+    #concatenated WKB bytes of geoms and the offsets of every geometry (len(geoms) + 1)
+    wkbs = shapely.to_wkb(np.asarray(geoms, dtype=object))
+    offsets = np.zeros(len(wkbs) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(wkb) for wkb in wkbs])
+    return np.frombuffer(b"".join(wkbs), dtype=np.uint8), offsets
+
+
+def geoms_from_wkb(buffer, offsets):
+    return shapely.from_wkb([buffer[offsets[i]:offsets[i + 1]].tobytes() for i in range(len(offsets) - 1)])
+
+
+class SharedGeodata:
+    def __init__(self, context, tables=None):
+        """Writes context and the named numpy tables (e.g. the service distances) into a new shared memory block."""
+        arrays = {
+            "site_centroids": context.site_centroids,
+            "site_areas": context.site_areas,
+            "service_centroids": context.service_centroids,
+            "existing_height": context.existing["height"]
+        }
+        for name, geoms in [("site_geoms", context.site_geoms), ("nature_union", [context.nature_union]), ("nature_polygons", context.nature_polygons),
+                            ("existing_geometry", context.existing["geometry"]), ("existing_footprint", context.existing["footprint"])]:
+            arrays[name + "_wkb"], arrays[name + "_offsets"] = wkb_arrays(geoms)
+        for name, table in (tables or {}).items():
+            arrays["table_" + name] = np.asarray(table)
+
+        #arrays are placed one after another at 8 byte aligned offsets
+        layout = {}
+        size = 0
+        for name, array in arrays.items():
+            layout[name] = (size, array.dtype.str, array.shape)
+            size += -(-array.nbytes // 8) * 8
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, array in arrays.items():
+            offset, dtype, shape = layout[name]
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)[...] = array
+
+        #everything else is small and pickled with the handle
+        self.handle = {
+            "name": self.shm.name,
+            "layout": layout,
+            "crs": context.crs,
+            "azimuth": context.azimuth,
+            "altitude": context.altitude,
+            "site_names": context.site_names,
+            "existing_id": context.existing["id"],
+            "existing_roof_area": context.existing["roof_area"],
+            "total_nature_area": context.total_nature_area,
+            "D_max": context.D_max
+        }
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(handle):
+    """
+    Attaches to the shared block of handle, returns (shared memory, EvaluationContext, tables).
+    The arrays are read-only views into the block, keep the shared memory object alive while they are used.
+    """
+    shm = shared_memory.SharedMemory(name=handle["name"])
+    arrays = {}
+    for name, (offset, dtype, shape) in handle["layout"].items():
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        arrays[name] = array
+    geoms = {name: geoms_from_wkb(arrays[name + "_wkb"], arrays[name + "_offsets"])
+             for name in ["site_geoms", "nature_union", "nature_polygons", "existing_geometry", "existing_footprint"]}
+
+    context = EvaluationContext.from_parts(
+        crs=handle["crs"],
+        azimuth=handle["azimuth"],
+        altitude=handle["altitude"],
+        site_names=handle["site_names"],
+        site_geoms=geoms["site_geoms"],
+        site_centroids=arrays["site_centroids"],
+        site_areas=arrays["site_areas"],
+        nature_union=geoms["nature_union"][0],
+        nature_polygons=geoms["nature_polygons"],
+        total_nature_area=handle["total_nature_area"],
+        existing={
+            "geometry": geoms["existing_geometry"],
+            "height": arrays["existing_height"],
+            "id": handle["existing_id"],
+            "footprint": geoms["existing_footprint"],
+            "roof_area": handle["existing_roof_area"]
+        },
+        service_centroids=arrays["service_centroids"],
+        #the service attribute columns are only needed to build the service table, which is shared as a table
+        service_columns={},
+        D_max=handle["D_max"]
+    )
+    tables = {name[len("table_"):]: array for name, array in arrays.items() if name.startswith("table_")}
+    return shm, context, tables
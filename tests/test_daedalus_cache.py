@@ -0,0 +1,46 @@
+##### test_daedalus_cache.py ###
+#GAIA only caches seeded Daedalus runs, unseeded runs always reach the Daedalus engine
+
+import pytest
+
+#GAIA imports the BuildingComposer, which needs ifcopenshell
+pytest.importorskip("BuildingComposer.BuildingComposer")
+
+import GAIA as gaia_module
+from GAIA import GAIA
+
+
+def make_gaia(tmp_path):
+    return GAIA(str(tmp_path / "report.txt"), str(tmp_path / "plan.ifc"), None, {}, 180, 30, "EPSG:32632", "school",
+                ["apartment", "office"], 4, 2, cache_dir=str(tmp_path))
+
+
+def daedalus_jobs(seed):
+    return {"Site1": {"popsize": 10, "generations": 5, "mutProb": 0.1, "target_GFA": 1000.0, "site_width": 40.0,
+                      "site_length": 30.0, "max_height": 22.6, "seed": seed}}
+
+
+def counting_engine(monkeypatch):
+    calls = []
+    def run_daedalus(ga_params, engine="array", capture=True):
+        calls.append(ga_params["seed"])
+        return {"buildings": []}, "", 0.0
+    monkeypatch.setattr(gaia_module, "run_daedalus", run_daedalus)
+    return calls
+
+
+def test_unseeded_runs_reach_the_engine(tmp_path, monkeypatch):
+    calls = counting_engine(monkeypatch)
+    gaia = make_gaia(tmp_path)
+    gaia.run_daedalus_jobs(daedalus_jobs(None), {"Site1": "A1"})
+    gaia.run_daedalus_jobs(daedalus_jobs(None), {"Site1": "A1"})
+    assert calls == [None, None]
+
+
+def test_seeded_runs_are_cached(tmp_path, monkeypatch):
+    calls = counting_engine(monkeypatch)
+    gaia = make_gaia(tmp_path)
+    first = gaia.run_daedalus_jobs(daedalus_jobs(7), {"Site1": "A1"})[0]
+    second = gaia.run_daedalus_jobs(daedalus_jobs(7), {"Site1": "A1"})[0]
+    assert calls == [7]
+    assert second["Site1"][0] == first["Site1"][0]
@@ -0,0 +1,38 @@
+##### test_exact_solver.py ###
+#the exact solver optimizes the same weighted objective as UPGA.evaluate, also with non-uniform fitness weights
+
+import os
+
+import geopandas as gpd
+
+from UPGA.UPGA import UPGA
+
+GEODATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "GeoData", "Nydalen")
+
+
+def load_layer(path, crs):
+    layer = gpd.read_file(path)
+    if layer.crs is None:
+        layer = layer.set_crs("EPSG:4326")
+    return layer.to_crs(crs)
+
+
+def load_nydalen(crs="EPSG:32632"):
+    files = {"sites": "Sites.json", "buildings": "Buildings.geojson", "barriers": "Barriers.geojson", "cycle": "Cycle.geojson",
+             "nature": "Nature.geojson", "services": "Services.geojson", "existing": "BuildingsModified.geojson"}
+    return {name: load_layer(os.path.join(GEODATA, file), crs) for name, file in files.items()}
+
+
+def test_exact_optimum_matches_evaluate_with_custom_weights(tmp_path):
+    building_specs = {"A1": {"type": "apartment", "target_gfa": 9000}, "O1": {"type": "office", "target_gfa": 6000},
+                      "S1": {"type": "school", "target_gfa": 3000}}
+    upga = UPGA(str(tmp_path / "report.txt"), "EPSG:32632", load_nydalen(), building_specs, 180, 30, seed=3)
+    upga.fitness_weights = {"GFA": 0.3, "Shadow Nature": 0.05, "Walkability": 0.1, "Cycleability": 0.2,
+                            "Serviceability": 0.15, "Shadow Buildings": 0.2}
+
+    result = upga.solve_exact(top_n=3)
+
+    assert result["fitness"] == upga.evaluate(result["best"])["total_fitness"]
+    for alternative in result["alternatives"]:
+        assert alternative["fitness"] == upga.evaluate(alternative["individual"])["total_fitness"]
+        assert alternative["fitness"] <= result["fitness"]